@@ -10,6 +10,7 @@ import pandas as pd
 import numpy as np
 import json
 import logging
+import asyncio
 from datetime import datetime
 from pathlib import Path
 from typing import Dict
@@ -241,7 +242,7 @@ class ThalaNetModelTrainer:
             stats = self.emergency_service.get_alert_statistics()
             
             # Save alert data
-            alerts_file = self.results_dir / 'emergency_alerts.json'
+            alerts_file = self.results_dir / 'emergency_alerts.jsonl'
             self.emergency_service.save_alert_data(str(alerts_file))
             
             logger.info(f"Emergency service testing completed. Alerts saved to {alerts_file}")
@@ -282,11 +283,12 @@ class ThalaNetModelTrainer:
             ]
             
             # Process messages
+            chat_responses = asyncio.run(self.chatbot_service.process_batch(
+                test_messages, datasets['donors'], datasets['patients'], datasets['emergency_requests']
+            ))
+            
             responses = []
-            for message in test_messages:
-                response = self.chatbot_service.process_message(
-                    message, datasets['donors'], datasets['patients'], datasets['emergency_requests']
-                )
+            for message, response in zip(test_messages, chat_responses):
                 responses.append({
                     'message': message.message_text,
                     'response': response.response_text,
@@ -653,7 +655,7 @@ class ThalaNetModelTrainer:
             summary.append("1. Review generated datasets in the 'data' directory")
             summary.append("2. Examine ML model performance in 'results/ml_training_results.json'")
             summary.append("3. Check matching system results in 'results/matching_results.json'")
-            summary.append("4. Review emergency service alerts in 'results/emergency_alerts.json'")
+            summary.append("4. Review emergency service alerts in 'results/emergency_alerts.jsonl'")
             summary.append("5. Test chatbot conversations in 'results/whatsapp_conversations.json'")
             summary.append("6. Verify E-RaktKosh integration in 'results/eraktkosh_test_results.json'")
             summary.append("7. Check security module results in 'results/security_test_results.json'")
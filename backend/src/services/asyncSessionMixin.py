@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Shared aiohttp session handling for ThalaNet services that make outbound HTTP calls
+"""
+
+from contextlib import asynccontextmanager
+from typing import Dict
+import asyncio
+import aiohttp
+
+
+class AsyncSessionMixin:
+    """
+    Pooled aiohttp session plus async context manager support
+
+    Services using this mixin need a ``config`` dict and should set
+    ``self._session = None`` in ``__init__``.
+
+    aiohttp sessions belong to the event loop that created them, so loop-bound
+    resources are recreated whenever the service is used from a new loop (for
+    example across separate asyncio.run() calls). Public entry points wrap
+    their work in _session_scope() so the session is closed on its own loop
+    unless a caller holds it open with ``async with service``.
+    """
+
+    _session_loop = None
+    _scope_depth = 0
+    _held_open = False
+
+    async def __aenter__(self):
+        await self._ensure_session()
+        self._held_open = True
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self._held_open = False
+        await self.aclose()
+
+    @asynccontextmanager
+    async def _session_scope(self):
+        """Close the session when the outermost scope exits, unless a caller holds it open"""
+        self._bind_to_running_loop()
+        self._scope_depth += 1
+        try:
+            yield
+        finally:
+            self._scope_depth -= 1
+            if self._scope_depth == 0 and not self._held_open:
+                await self.aclose()
+
+    def _session_kwargs(self) -> Dict:
+        """Keyword arguments for the shared ClientSession; override to add headers or timeouts"""
+        connector = aiohttp.TCPConnector(
+            limit=self.config.get('http_connection_limit', 100),
+            keepalive_timeout=self.config.get('http_keepalive_seconds', 60)
+        )
+        return {'connector': connector}
+
+    def _bind_to_running_loop(self):
+        """Forget loop-bound resources if the running loop differs from the one that created them"""
+        loop = asyncio.get_running_loop()
+        if loop is not self._session_loop:
+            self._session_loop = loop
+            self._reset_loop_resources()
+
+    def _reset_loop_resources(self):
+        """Drop resources owned by the previous loop; subclasses extend this for their own"""
+        if self._session is not None and not self._session.closed:
+            # Its loop is gone, so it can't be closed; detach so it isn't reported as leaked
+            self._session.detach()
+        self._session = None
+        self._scope_depth = 0
+        self._held_open = False
+
+    async def _ensure_session(self) -> aiohttp.ClientSession:
+        """Create the shared HTTP session once per event loop, reusing pooled keep-alive connections"""
+        self._bind_to_running_loop()
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(**self._session_kwargs())
+        return self._session
+
+    async def aclose(self):
+        """Close the shared HTTP session"""
+        self._bind_to_running_loop()
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
@@ -9,15 +9,20 @@ import numpy as np
 from datetime import datetime, timedelta
 from typing import Dict, List, Tuple, Optional
 import json
+import orjson
 import asyncio
 import logging
 from dataclasses import dataclass
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-import requests
 import time
 
+try:
+    from services.asyncSessionMixin import AsyncSessionMixin
+except ImportError:  # run directly as a script from the services directory
+    from asyncSessionMixin import AsyncSessionMixin
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -41,7 +46,18 @@ class EmergencyAlert:
     matched_donors: List[Dict] = None
     notification_sent: bool = False
 
-class EmergencyNotificationService:
+class EmergencyNotificationService(AsyncSessionMixin):
+    # Urgency levels that trigger an immediate alert
+    _URGENT_LEVELS = frozenset({'HIGH', 'CRITICAL'})
+    
+    # Timeframe description shown in alert messages per urgency level
+    _URGENCY_TIMEFRAMES = {
+        'LOW': '7-30 days',
+        'MEDIUM': '3-7 days',
+        'HIGH': '1-3 days',
+        'CRITICAL': '1-24 hours'
+    }
+    
     def __init__(self, config: Dict = None):
         """
         Initialize the emergency notification service
@@ -58,6 +74,9 @@ class EmergencyNotificationService:
         self.donor_prediction_model = None
         self.matching_system = None
         
+        # Shared HTTP session for channel sends (created lazily inside the event loop)
+        self._session = None
+        
         # Initialize notification channels
         self.notification_channels = {
             'email': self._send_email_notification,
@@ -77,8 +96,30 @@ class EmergencyNotificationService:
             'max_distance_km': 100,
             'min_matching_score': 50,
             'alert_expiry_hours': 24,
-            'batch_notification_size': 10
+            'batch_notification_size': 10,
+            'channel_webhooks': {},  # channel -> provider endpoint URL
+            'http_connection_limit': 100,
+            'http_keepalive_seconds': 60
+        }
+    
+    async def _post_notification(self, channel: str, message: str, alert: EmergencyAlert,
+                                 matched_donors: List[Dict]) -> bool:
+        """POST a notification to the provider endpoint configured for a channel"""
+        url = self.config.get('channel_webhooks', {}).get(channel)
+        if not url:
+            return False
+        
+        payload = {
+            'alert_id': alert.alert_id,
+            'request_id': alert.request_id,
+            'message': message,
+            'recipients': [donor.get('contact_number') for donor in matched_donors]
         }
+        
+        session = await self._ensure_session()
+        async with session.post(url, json=payload) as response:
+            response.raise_for_status()
+        return True
     
     def detect_emergency_requests(self, emergency_requests_df: pd.DataFrame) -> List[EmergencyAlert]:
         """
@@ -93,7 +134,16 @@ class EmergencyNotificationService:
         new_alerts = []
         current_time = datetime.now()
         
-        for _, request in emergency_requests_df.iterrows():
+        # Requests without an urgency level default to MEDIUM, so none are urgent
+        if 'urgency_level' not in emergency_requests_df.columns:
+            return new_alerts
+        
+        # Keep only HIGH/CRITICAL requests before walking the rows
+        urgent_requests = emergency_requests_df[
+            emergency_requests_df['urgency_level'].isin(self._URGENT_LEVELS)
+        ]
+        
+        for _, request in urgent_requests.iterrows():
             request_id = request['request_id']
             
             # Skip if already processed
@@ -108,29 +158,27 @@ class EmergencyNotificationService:
             if time_diff.total_seconds() > 3600:
                 continue
             
-            # Check urgency level
-            urgency = request.get('urgency_level', 'MEDIUM')
-            if urgency in ['HIGH', 'CRITICAL']:
-                # Create emergency alert
-                alert = EmergencyAlert(
-                    alert_id=f"ALERT_{len(self.active_alerts) + 1:06d}",
-                    request_id=request_id,
-                    blood_type_needed=request['blood_type_needed'],
-                    urgency_level=urgency,
-                    location=request['location'],
-                    latitude=request.get('latitude', 0),
-                    longitude=request.get('longitude', 0),
-                    units_required=request.get('units_required', 1),
-                    hospital_name=request.get('hospital_name', 'Unknown'),
-                    contact_person=request.get('contact_person', 'Unknown'),
-                    contact_number=request.get('contact_number', 'Unknown'),
-                    timestamp=request_time
-                )
-                
-                new_alerts.append(alert)
-                self.active_alerts[request_id] = alert
-                
-                logger.info(f"New emergency alert created: {alert.alert_id} for {urgency} urgency")
+            # Create emergency alert
+            urgency = request['urgency_level']
+            alert = EmergencyAlert(
+                alert_id=f"ALERT_{len(self.active_alerts) + 1:06d}",
+                request_id=request_id,
+                blood_type_needed=request['blood_type_needed'],
+                urgency_level=urgency,
+                location=request['location'],
+                latitude=request.get('latitude', 0),
+                longitude=request.get('longitude', 0),
+                units_required=request.get('units_required', 1),
+                hospital_name=request.get('hospital_name', 'Unknown'),
+                contact_person=request.get('contact_person', 'Unknown'),
+                contact_number=request.get('contact_number', 'Unknown'),
+                timestamp=request_time
+            )
+            
+            new_alerts.append(alert)
+            self.active_alerts[request_id] = alert
+            
+            logger.info(f"New emergency alert created: {alert.alert_id} for {urgency} urgency")
         
         return new_alerts
     
@@ -258,13 +306,7 @@ Please contact the hospital immediately if you can donate!
     
     def _get_urgency_timeframe(self, urgency_level: str) -> str:
         """Get timeframe description for urgency level"""
-        timeframes = {
-            'LOW': '7-30 days',
-            'MEDIUM': '3-7 days',
-            'HIGH': '1-3 days',
-            'CRITICAL': '1-24 hours'
-        }
-        return timeframes.get(urgency_level, 'Unknown')
+        return self._URGENCY_TIMEFRAMES.get(urgency_level, 'Unknown')
     
     async def send_emergency_notifications(self, alert: EmergencyAlert, matched_donors: List[Dict]):
         """
@@ -309,44 +351,48 @@ Please contact the hospital immediately if you can donate!
         except Exception as e:
             logger.error(f"Error sending notification via {channel}: {e}")
     
-    def _send_email_notification(self, message: str, alert: EmergencyAlert, matched_donors: List[Dict]) -> bool:
+    async def _send_email_notification(self, message: str, alert: EmergencyAlert, matched_donors: List[Dict]) -> bool:
         """Send email notification"""
         try:
             # This would integrate with your email service (SendGrid, AWS SES, etc.)
-            # For now, just log the email
+            # Posts to the configured channel webhook, otherwise just logs the email
+            await self._post_notification('email', message, alert, matched_donors)
             logger.info(f"EMAIL NOTIFICATION SENT:\n{message}")
             return True
         except Exception as e:
             logger.error(f"Email notification failed: {e}")
             return False
     
-    def _send_sms_notification(self, message: str, alert: EmergencyAlert, matched_donors: List[Dict]) -> bool:
+    async def _send_sms_notification(self, message: str, alert: EmergencyAlert, matched_donors: List[Dict]) -> bool:
         """Send SMS notification"""
         try:
             # This would integrate with SMS service (Twilio, AWS SNS, etc.)
-            # For now, just log the SMS
+            # Posts to the configured channel webhook, otherwise just logs the SMS
+            await self._post_notification('sms', message, alert, matched_donors)
             logger.info(f"SMS NOTIFICATION SENT:\n{message}")
             return True
         except Exception as e:
             logger.error(f"SMS notification failed: {e}")
             return False
     
-    def _send_whatsapp_notification(self, message: str, alert: EmergencyAlert, matched_donors: List[Dict]) -> bool:
+    async def _send_whatsapp_notification(self, message: str, alert: EmergencyAlert, matched_donors: List[Dict]) -> bool:
         """Send WhatsApp notification"""
         try:
             # This would integrate with WhatsApp Business API
-            # For now, just log the WhatsApp message
+            # Posts to the configured channel webhook, otherwise just logs the WhatsApp message
+            await self._post_notification('whatsapp', message, alert, matched_donors)
             logger.info(f"WHATSAPP NOTIFICATION SENT:\n{message}")
             return True
         except Exception as e:
             logger.error(f"WhatsApp notification failed: {e}")
             return False
     
-    def _send_push_notification(self, message: str, alert: EmergencyAlert, matched_donors: List[Dict]) -> bool:
+    async def _send_push_notification(self, message: str, alert: EmergencyAlert, matched_donors: List[Dict]) -> bool:
         """Send push notification"""
         try:
             # This would integrate with push notification service (Firebase, etc.)
-            # For now, just log the push notification
+            # Posts to the configured channel webhook, otherwise just logs the push notification
+            await self._post_notification('push', message, alert, matched_donors)
             logger.info(f"PUSH NOTIFICATION SENT:\n{message}")
             return True
         except Exception as e:
@@ -372,33 +418,40 @@ Please contact the hospital immediately if you can donate!
         
         logger.info(f"Detected {len(new_alerts)} new emergency requests")
         
-        # Process each alert
-        for alert in new_alerts:
-            try:
-                # Find matching donors
-                matched_donors = self.find_matching_donors_for_alert(alert, donors_df)
-                
-                if matched_donors:
-                    # Send notifications asynchronously
-                    asyncio.run(self.send_emergency_notifications(alert, matched_donors))
-                else:
-                    logger.warning(f"No matching donors found for alert {alert.alert_id}")
-                
-                # Add to history
-                self.alert_history.append({
-                    'alert_id': alert.alert_id,
-                    'timestamp': alert.timestamp.isoformat(),
-                    'status': 'processed',
-                    'matched_donors_count': len(matched_donors) if matched_donors else 0
-                })
-                
-            except Exception as e:
-                logger.error(f"Error processing alert {alert.alert_id}: {e}")
-                alert.status = 'error'
+        # Process all alerts in one event loop so they share the HTTP session
+        asyncio.run(self._process_alerts_async(new_alerts, donors_df))
         
         # Clean up expired alerts
         self._cleanup_expired_alerts()
     
+    async def _process_alerts_async(self, alerts: List[EmergencyAlert], donors_df: pd.DataFrame):
+        """Match donors and send notifications for each alert"""
+        try:
+            for alert in alerts:
+                try:
+                    # Find matching donors
+                    matched_donors = self.find_matching_donors_for_alert(alert, donors_df)
+                    
+                    if matched_donors:
+                        # Send notifications asynchronously
+                        await self.send_emergency_notifications(alert, matched_donors)
+                    else:
+                        logger.warning(f"No matching donors found for alert {alert.alert_id}")
+                    
+                    # Add to history
+                    self.alert_history.append({
+                        'alert_id': alert.alert_id,
+                        'timestamp': alert.timestamp.isoformat(),
+                        'status': 'processed',
+                        'matched_donors_count': len(matched_donors) if matched_donors else 0
+                    })
+                    
+                except Exception as e:
+                    logger.error(f"Error processing alert {alert.alert_id}: {e}")
+                    alert.status = 'error'
+        finally:
+            await self.aclose()
+    
     def _cleanup_expired_alerts(self):
         """Remove expired alerts from active alerts"""
         current_time = datetime.now()
@@ -436,19 +489,33 @@ Please contact the hospital immediately if you can donate!
             'last_processed': self.alert_history[-1]['timestamp'] if self.alert_history else None
         }
     
-    def save_alert_data(self, output_file: str = "emergency_alerts.json"):
-        """Save alert data to JSON file"""
+    def _alert_record(self, request_id: str, alert: EmergencyAlert) -> Dict:
+        """Serializable summary of an active alert"""
+        return {
+            'request_id': request_id,
+            'alert_id': alert.alert_id,
+            'blood_type_needed': alert.blood_type_needed,
+            'urgency_level': alert.urgency_level,
+            'location': alert.location,
+            'timestamp': alert.timestamp.isoformat(),
+            'status': alert.status,
+            'matched_donors_count': len(alert.matched_donors) if alert.matched_donors else 0
+        }
+    
+    def save_alert_data(self, output_file: str = "emergency_alerts.jsonl"):
+        """Stream active alerts to a newline-delimited JSON file, one alert per line"""
+        with open(output_file, 'wb') as f:
+            for req_id, alert in self.active_alerts.items():
+                f.write(orjson.dumps(self._alert_record(req_id, alert), default=str))
+                f.write(b'\n')
+        
+        logger.info(f"Alert data saved to {output_file}")
+    
+    def save_alert_data_legacy(self, output_file: str = "emergency_alerts.json"):
+        """Save alert data, history and statistics to a single JSON document"""
         data = {
             'active_alerts': {
-                req_id: {
-                    'alert_id': alert.alert_id,
-                    'blood_type_needed': alert.blood_type_needed,
-                    'urgency_level': alert.urgency_level,
-                    'location': alert.location,
-                    'timestamp': alert.timestamp.isoformat(),
-                    'status': alert.status,
-                    'matched_donors_count': len(alert.matched_donors) if alert.matched_donors else 0
-                }
+                req_id: self._alert_record(req_id, alert)
                 for req_id, alert in self.active_alerts.items()
             },
             'alert_history': self.alert_history,
@@ -8,20 +8,73 @@ import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 from typing import Dict, List, Tuple, Optional
-import json
+import orjson
+import msgspec
 import requests
+import aiohttp
+import asyncio
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from scipy.spatial import cKDTree
 import logging
-from dataclasses import dataclass
 import time
-import hashlib
+
+try:
+    from services.asyncSessionMixin import AsyncSessionMixin
+except ImportError:  # run directly as a script from the services directory
+    from asyncSessionMixin import AsyncSessionMixin
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-@dataclass
-class BloodBankInfo:
-    """Data class for blood bank information"""
+# Fixed column order of the blood inventory matrix
+BLOOD_TYPES = ('O+', 'O-', 'A+', 'A-', 'B+', 'B-', 'AB+', 'AB-')
+BLOOD_TYPE_INDEX = {blood_type: i for i, blood_type in enumerate(BLOOD_TYPES)}
+
+# Major cities in India used for mock blood banks
+MOCK_CITIES = (
+    {'name': 'Mumbai', 'lat': 19.0760, 'lon': 72.8777},
+    {'name': 'Delhi', 'lat': 28.7041, 'lon': 77.1025},
+    {'name': 'Bangalore', 'lat': 12.9716, 'lon': 77.5946},
+    {'name': 'Chennai', 'lat': 13.0827, 'lon': 80.2707},
+    {'name': 'Hyderabad', 'lat': 17.3850, 'lon': 78.4867},
+    {'name': 'Kolkata', 'lat': 22.5726, 'lon': 88.3639},
+    {'name': 'Pune', 'lat': 18.5204, 'lon': 73.8567},
+    {'name': 'Ahmedabad', 'lat': 23.0225, 'lon': 72.5714}
+)
+
+EARTH_RADIUS_KM = 6371.0
+
+# Optional JIT for the inventory rollup; NumPy reductions are used without numba
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+if njit is not None:
+    @njit(cache=True)
+    def _inv_rollup(inv, active, out_total, out_avail):
+        """Sum units and count stocked banks per blood type in a single pass"""
+        for i in range(inv.shape[0]):
+            if not active[i]:
+                continue
+            for j in range(inv.shape[1]):
+                v = inv[i, j]
+                out_total[j] += v
+                if v > 0:
+                    out_avail[j] += 1
+else:
+    _inv_rollup = None
+
+def _enc_hook(obj):
+    """Serialize inventory arrays as blood_type -> units dictionaries"""
+    if isinstance(obj, np.ndarray):
+        return dict(zip(BLOOD_TYPES, obj.tolist()))
+    raise NotImplementedError(f"Cannot serialize {type(obj).__name__}")
+
+class BloodBankInfo(msgspec.Struct):
+    """Struct for blood bank information"""
     bank_id: str
     name: str
     location: str
@@ -29,13 +82,12 @@ class BloodBankInfo:
     longitude: float
     contact_number: str
     email: str
-    blood_inventory: Dict[str, int]  # blood_type -> units_available
+    blood_inventory: np.ndarray  # int16 units_available, indexed by BLOOD_TYPE_INDEX
     last_updated: datetime
     status: str = 'active'  # active, inactive, maintenance
 
-@dataclass
-class BloodRequest:
-    """Data class for blood requests"""
+class BloodRequest(msgspec.Struct):
+    """Struct for blood requests"""
     request_id: str
     blood_type: str
     units_required: int
@@ -49,7 +101,7 @@ class BloodRequest:
     timestamp: datetime
     status: str = 'pending'  # pending, fulfilled, expired, cancelled
 
-class ERaktKoshService:
+class ERaktKoshService(AsyncSessionMixin):
     def __init__(self, config: Dict = None):
         """
         Initialize the E-RaktKosh API integration service
@@ -60,15 +112,31 @@ class ERaktKoshService:
         self.config = config or self._get_default_config()
         self.api_base_url = self.config['api_base_url']
         self.api_key = self.config['api_key']
-        self.session = requests.Session()
+        self.session = self._create_session()
+        
+        # Async session/semaphore for concurrent queries, created per event loop on first use
+        self._session: Optional[aiohttp.ClientSession] = None
+        self._aio_semaphore: Optional[asyncio.Semaphore] = None
         
         # Mock data for development/testing
+        self.rng = np.random.default_rng(self.config.get('mock_seed'))
         self.mock_blood_banks = self._generate_mock_blood_banks()
         self.mock_requests = self._generate_mock_requests()
         
-        # API rate limiting
-        self.last_api_call = 0
-        self.api_call_count = 0
+        # Serialized mock data, built on first use and reset when requests change;
+        # readers always get copies of the rows they ask for
+        self._blood_banks_serialized = None
+        self._requests_serialized = None
+        
+        # API rate limiting (token bucket refilled on the monotonic clock)
+        self._bucket_capacity = self.config['rate_limit_per_minute']
+        self._bucket_tokens = self._bucket_capacity
+        self._bucket_last_ns = time.monotonic_ns()
+        self._ns_per_token = 60_000_000_000 // self._bucket_capacity
+        
+        # Response timestamp, reformatted at most every 100ms
+        self._cached_now_iso = None
+        self._cached_now_ts = 0
         
         logger.info("E-RaktKosh Service initialized")
     
@@ -81,57 +149,150 @@ class ERaktKoshService:
             'max_retries': 3,
             'rate_limit_per_minute': 60,
             'enable_mock_mode': True,  # Set to False for production
-            'mock_data_size': 100
+            'mock_data_size': 100,
+            'mock_seed': None  # Set an integer for reproducible mock data
         }
     
+    def _create_session(self) -> requests.Session:
+        """Create an HTTP session with pooled keep-alive connections and retry backoff"""
+        session = requests.Session()
+        
+        retry = Retry(
+            total=self.config['max_retries'],
+            backoff_factor=0.3,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=['GET', 'POST', 'PUT']
+        )
+        adapter = HTTPAdapter(pool_connections=20, pool_maxsize=50, max_retries=retry)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        
+        session.headers.update({
+            'Authorization': f'Bearer {self.api_key}',
+            'Content-Type': 'application/json',
+            'User-Agent': 'ThalaNet/1.0'
+        })
+        return session
+    
     def _generate_mock_blood_banks(self) -> List[BloodBankInfo]:
         """Generate mock blood bank data for development"""
         blood_banks = []
-        
-        # Major cities in India
-        cities = [
-            {'name': 'Mumbai', 'lat': 19.0760, 'lon': 72.8777},
-            {'name': 'Delhi', 'lat': 28.7041, 'lon': 77.1025},
-            {'name': 'Bangalore', 'lat': 12.9716, 'lon': 77.5946},
-            {'name': 'Chennai', 'lat': 13.0827, 'lon': 80.2707},
-            {'name': 'Hyderabad', 'lat': 17.3850, 'lon': 78.4867},
-            {'name': 'Kolkata', 'lat': 22.5726, 'lon': 88.3639},
-            {'name': 'Pune', 'lat': 18.5204, 'lon': 73.8567},
-            {'name': 'Ahmedabad', 'lat': 23.0225, 'lon': 72.5714}
+        cities = MOCK_CITIES
+        
+        # Draw every random field for all banks at once
+        rng = self.rng
+        num_banks = rng.integers(3, 6, size=len(cities))  # 3-5 blood banks per city
+        total_banks = int(num_banks.sum())
+        
+        # Random inventory levels (0-50 units), one column per blood type
+        inventories = rng.integers(0, 51, size=(total_banks, len(BLOOD_TYPES)), dtype=np.int16)
+        bank_lats = np.repeat([city['lat'] for city in cities], num_banks) + rng.normal(0, 0.01, size=total_banks)
+        bank_lons = np.repeat([city['lon'] for city in cities], num_banks) + rng.normal(0, 0.01, size=total_banks)
+        lat_list = bank_lats.tolist()
+        lon_list = bank_lons.tolist()
+        phones = rng.integers(7000000000, 9999999999, size=total_banks).tolist()
+        hours_ago = rng.integers(1, 24, size=total_banks).tolist()
+        statuses = rng.choice(['active', 'active', 'active', 'maintenance'], size=total_banks, p=[0.8, 0.1, 0.05, 0.05])
+        status_list = statuses.tolist()
+        
+        # Bank IDs from per-city prefixes computed once
+        prefixes = [city['name'][:3].upper() for city in cities]
+        bank_ids = [
+            f"BB_{prefixes[i]}_{i+1:02d}_{j+1:02d}"
+            for i, city_banks in enumerate(num_banks.tolist())
+            for j in range(city_banks)
         ]
         
-        blood_types = ['O+', 'O-', 'A+', 'A-', 'B+', 'B-', 'AB+', 'AB-']
-        
+        now = datetime.now()
+        k = 0
         for i, city in enumerate(cities):
-            # Generate 3-5 blood banks per city
-            num_banks = np.random.randint(3, 6)
-            
-            for j in range(num_banks):
-                bank_id = f"BB_{city['name'][:3].upper()}_{i+1:02d}_{j+1:02d}"
-                
-                # Generate blood inventory
-                inventory = {}
-                for blood_type in blood_types:
-                    # Random inventory levels (0-50 units)
-                    inventory[blood_type] = np.random.randint(0, 51)
-                
+            for j in range(num_banks[i]):
                 blood_bank = BloodBankInfo(
-                    bank_id=bank_id,
+                    bank_id=bank_ids[k],
                     name=f"{city['name']} Blood Bank {j+1}",
                     location=f"{city['name']}, India",
-                    latitude=city['lat'] + np.random.normal(0, 0.01),
-                    longitude=city['lon'] + np.random.normal(0, 0.01),
-                    contact_number=f"+91-{np.random.randint(7000000000, 9999999999)}",
+                    latitude=lat_list[k],
+                    longitude=lon_list[k],
+                    contact_number=f"+91-{phones[k]}",
                     email=f"bloodbank{j+1}@{city['name'].lower()}.gov.in",
-                    blood_inventory=inventory,
-                    last_updated=datetime.now() - timedelta(hours=np.random.randint(1, 24)),
-                    status=np.random.choice(['active', 'active', 'active', 'maintenance'], p=[0.8, 0.1, 0.05, 0.05])
+                    blood_inventory=inventories[k],  # row view into the inventory matrix
+                    last_updated=now - timedelta(hours=hours_ago[k]),
+                    status=status_list[k]
                 )
                 
                 blood_banks.append(blood_bank)
+                k += 1
+        
+        # Inventory as a (n_banks, n_blood_types) matrix plus active-bank mask;
+        # each bank's blood_inventory is a view of its row
+        self._inv_matrix = inventories
+        self._active_mask = statuses == 'active'
+        
+        # Spatial index on unit-sphere coordinates for radius queries
+        self._bank_lats = bank_lats
+        self._bank_lons = bank_lons
+        self._bank_tree = cKDTree(self._to_unit_xyz(bank_lats, bank_lons))
         
         return blood_banks
     
+    @staticmethod
+    def _to_unit_xyz(lats, lons) -> np.ndarray:
+        """Project latitude/longitude (degrees) onto 3D unit-sphere coordinates"""
+        lat_r = np.radians(lats)
+        lon_r = np.radians(lons)
+        return np.stack([
+            np.cos(lat_r) * np.cos(lon_r),
+            np.cos(lat_r) * np.sin(lon_r),
+            np.sin(lat_r)
+        ], axis=-1)
+    
+    def _radius_query(self, lat: float, lon: float, km: float) -> List[int]:
+        """
+        Find mock blood banks within a great-circle radius
+        
+        Args:
+            lat: Latitude of the search centre
+            lon: Longitude of the search centre
+            km: Search radius in kilometers
+            
+        Returns:
+            Sorted indices into mock_blood_banks
+        """
+        # Great-circle distance -> straight-line chord on the unit sphere
+        chord = 2 * np.sin(min(km / EARTH_RADIUS_KM, np.pi) / 2)
+        return sorted(self._bank_tree.query_ball_point(self._to_unit_xyz(lat, lon), chord))
+    
+    @staticmethod
+    def _haversine_matrix(lat1, lon1, lat2, lon2) -> np.ndarray:
+        """
+        Pairwise great-circle distances between two sets of points
+        
+        Args:
+            lat1, lon1: Arrays of n latitudes/longitudes in degrees
+            lat2, lon2: Arrays of m latitudes/longitudes in degrees
+            
+        Returns:
+            (n, m) array of distances in kilometers
+        """
+        lat1 = np.radians(np.asarray(lat1, dtype=float))[:, None]
+        lon1 = np.radians(np.asarray(lon1, dtype=float))[:, None]
+        lat2 = np.radians(np.asarray(lat2, dtype=float))[None, :]
+        lon2 = np.radians(np.asarray(lon2, dtype=float))[None, :]
+        
+        dlat = lat2 - lat1
+        dlon = lon2 - lon1
+        a = np.sin(dlat / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin(dlon / 2) ** 2
+        return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+    
+    @staticmethod
+    def _resolve_location(location: str) -> Optional[Tuple[float, float]]:
+        """Resolve a location string to the coordinates of a known city"""
+        location_lower = location.lower()
+        for city in MOCK_CITIES:
+            if city['name'].lower() in location_lower:
+                return city['lat'], city['lon']
+        return None
+    
     def _generate_mock_requests(self) -> List[BloodRequest]:
         """Generate mock blood request data for development"""
         requests = []
@@ -143,53 +304,114 @@ class ERaktKoshService:
             'KIMS Hospital', 'Narayana Health', 'Medanta Hospital', 'BLK Hospital'
         ]
         
-        for i in range(self.config['mock_data_size']):
-            blood_type = np.random.choice(blood_types)
-            urgency = np.random.choice(urgency_levels, p=[0.3, 0.4, 0.2, 0.1])
-            
-            # Generate random location
-            city_idx = np.random.randint(0, len(self.mock_blood_banks))
-            city = self.mock_blood_banks[city_idx]
+        # Draw every random field for all requests at once
+        rng = self.rng
+        n = self.config['mock_data_size']
+        request_blood_types = rng.choice(blood_types, size=n).tolist()
+        urgencies = rng.choice(urgency_levels, size=n, p=[0.3, 0.4, 0.2, 0.1]).tolist()
+        bank_indices = rng.integers(0, len(self.mock_blood_banks), size=n).tolist()
+        units = rng.integers(1, 6, size=n).tolist()
+        hospital_names = rng.choice(hospitals, size=n).tolist()
+        phones = rng.integers(7000000000, 9999999999, size=n).tolist()
+        lat_jitter = rng.normal(0, 0.01, size=n).tolist()
+        lon_jitter = rng.normal(0, 0.01, size=n).tolist()
+        hours_ago = rng.integers(1, 168, size=n).tolist()
+        statuses = rng.choice(['pending', 'fulfilled', 'expired'], size=n, p=[0.6, 0.3, 0.1]).tolist()
+        request_ids = np.char.mod('REQ_%06d', np.arange(1, n + 1)).tolist()
+        
+        now = datetime.now()
+        for i in range(n):
+            # Place the request around a random blood bank
+            city = self.mock_blood_banks[bank_indices[i]]
             
             request = BloodRequest(
-                request_id=f"REQ_{i+1:06d}",
-                blood_type=blood_type,
-                units_required=np.random.randint(1, 6),
-                urgency_level=urgency,
+                request_id=request_ids[i],
+                blood_type=request_blood_types[i],
+                units_required=units[i],
+                urgency_level=urgencies[i],
                 patient_name=f"Patient_{i+1}",
-                hospital_name=np.random.choice(hospitals),
-                contact_number=f"+91-{np.random.randint(7000000000, 9999999999)}",
+                hospital_name=hospital_names[i],
+                contact_number=f"+91-{phones[i]}",
                 location=city.location,
-                latitude=city.latitude + np.random.normal(0, 0.01),
-                longitude=city.longitude + np.random.normal(0, 0.01),
-                timestamp=datetime.now() - timedelta(hours=np.random.randint(1, 168)),
-                status=np.random.choice(['pending', 'fulfilled', 'expired'], p=[0.6, 0.3, 0.1])
+                latitude=city.latitude + lat_jitter[i],
+                longitude=city.longitude + lon_jitter[i],
+                timestamp=now - timedelta(hours=hours_ago[i]),
+                status=statuses[i]
             )
             
             requests.append(request)
         
+        self._req_df = self._build_request_frame(requests)
+        self._location_index = self._build_location_index(self._req_df)
+        
         return requests
     
-    def _rate_limit_check(self):
-        """Check and enforce API rate limiting"""
-        current_time = time.time()
+    def _build_request_frame(self, requests: List[BloodRequest]) -> pd.DataFrame:
+        """Build a DataFrame of mock requests used for vectorized filtering"""
+        req_df = pd.DataFrame(
+            msgspec.to_builtins(requests),
+            columns=list(BloodRequest.__struct_fields__)
+        )
+        return req_df
+    
+    @staticmethod
+    def _build_location_index(req_df: pd.DataFrame) -> Dict[str, np.ndarray]:
+        """Map each distinct lowercased request location to its row positions"""
+        if req_df.empty:
+            return {}
+        return req_df.groupby(req_df['location'].str.lower()).indices
+    
+    def _now_iso(self) -> str:
+        """Current time as an ISO string, shared by responses within 100ms"""
+        now_ns = time.monotonic_ns()
+        if self._cached_now_iso is None or now_ns - self._cached_now_ts >= 100_000_000:
+            self._cached_now_iso = datetime.now().isoformat()
+            self._cached_now_ts = now_ns
+        return self._cached_now_iso
+    
+    def _refill_bucket(self, now: int) -> int:
+        """Add one token per elapsed token interval, up to the bucket capacity, and return the tokens available"""
+        refill = (now - self._bucket_last_ns) // self._ns_per_token
+        if refill > 0:
+            self._bucket_tokens = min(self._bucket_capacity, self._bucket_tokens + refill)
+            if self._bucket_tokens == self._bucket_capacity:
+                self._bucket_last_ns = now
+            else:
+                self._bucket_last_ns += refill * self._ns_per_token
+        return self._bucket_tokens
+    
+    def _reserve_token(self) -> int:
+        """
+        Take a token from the rate-limit bucket
         
-        # Reset counter if a minute has passed
-        if current_time - self.last_api_call >= 60:
-            self.api_call_count = 0
-            self.last_api_call = current_time
+        Returns:
+            Nanoseconds to wait before the call may proceed (0 if a token was free)
+        """
+        now = time.monotonic_ns()
         
-        # Check if we're over the limit
-        if self.api_call_count >= self.config['rate_limit_per_minute']:
-            wait_time = 60 - (current_time - self.last_api_call)
-            logger.warning(f"Rate limit reached. Waiting {wait_time:.2f} seconds...")
-            time.sleep(wait_time)
-            self.api_call_count = 0
-            self.last_api_call = time.time()
+        if self._refill_bucket(now) > 0:
+            self._bucket_tokens -= 1
+            return 0
         
-        self.api_call_count += 1
+        # Bucket is empty: reserve the next token and wait only until it is due
+        wait_ns = self._bucket_last_ns + self._ns_per_token - now
+        self._bucket_last_ns += self._ns_per_token
+        logger.warning(f"Rate limit reached. Waiting {wait_ns / 1e9:.2f} seconds...")
+        return wait_ns
     
-    def _make_api_call(self, endpoint: str, method: str = 'GET', data: Dict = None) -> Dict:
+    def _rate_limit_check(self):
+        """Check and enforce API rate limiting"""
+        wait_ns = self._reserve_token()
+        if wait_ns:
+            time.sleep(wait_ns / 1e9)
+    
+    async def _rate_limit_check_async(self):
+        """Async rate limiting that yields to the event loop while waiting"""
+        wait_ns = self._reserve_token()
+        if wait_ns:
+            await asyncio.sleep(wait_ns / 1e9)
+    
+    def _make_api_call(self, endpoint: str, method: str = 'GET', data: Dict = None, params: Dict = None) -> Dict:
         """
         Make API call to E-RaktKosh with rate limiting and error handling
         
@@ -197,32 +419,27 @@ class ERaktKoshService:
             endpoint: API endpoint
             method: HTTP method
             data: Request data for POST/PUT
+            params: Query string parameters (URL-encoded by requests)
             
         Returns:
             API response data
         """
         if self.config['enable_mock_mode']:
             # Return mock data for development
-            return self._get_mock_response(endpoint, method, data)
+            return self._get_mock_response(endpoint, method, data, params)
         
         # Real API call
         self._rate_limit_check()
         
         try:
-            headers = {
-                'Authorization': f'Bearer {self.api_key}',
-                'Content-Type': 'application/json',
-                'User-Agent': 'ThalaNet/1.0'
-            }
-            
             url = f"{self.api_base_url}{endpoint}"
             
             if method.upper() == 'GET':
-                response = self.session.get(url, headers=headers, timeout=self.config['timeout_seconds'])
+                response = self.session.get(url, params=params, timeout=self.config['timeout_seconds'])
             elif method.upper() == 'POST':
-                response = self.session.post(url, headers=headers, json=data, timeout=self.config['timeout_seconds'])
+                response = self.session.post(url, params=params, json=data, timeout=self.config['timeout_seconds'])
             elif method.upper() == 'PUT':
-                response = self.session.put(url, headers=headers, json=data, timeout=self.config['timeout_seconds'])
+                response = self.session.put(url, params=params, json=data, timeout=self.config['timeout_seconds'])
             else:
                 raise ValueError(f"Unsupported HTTP method: {method}")
             
@@ -236,66 +453,148 @@ class ERaktKoshService:
             logger.error(f"Unexpected error in API call: {e}")
             return {'error': str(e), 'status': 'failed'}
     
-    def _get_mock_response(self, endpoint: str, method: str, data: Dict = None) -> Dict:
+    def _session_kwargs(self) -> Dict:
+        """Reuse the requests session headers and the configured timeout for aiohttp"""
+        return {
+            'headers': dict(self.session.headers),
+            'timeout': aiohttp.ClientTimeout(total=self.config['timeout_seconds'])
+        }
+    
+    def _reset_loop_resources(self):
+        """Drop the session and the concurrency limit created on the previous loop"""
+        super()._reset_loop_resources()
+        self._aio_semaphore = None
+    
+    async def _ensure_session(self) -> aiohttp.ClientSession:
+        """Create the shared aiohttp session (and concurrency limit) for the running loop"""
+        session = await super()._ensure_session()
+        if self._aio_semaphore is None:
+            self._aio_semaphore = asyncio.Semaphore(self.config['rate_limit_per_minute'])
+        return session
+    
+    async def _make_api_call_async(self, endpoint: str, method: str = 'GET', data: Dict = None, params: Dict = None) -> Dict:
+        """
+        Async version of _make_api_call for issuing many requests concurrently
+        
+        Args:
+            endpoint: API endpoint
+            method: HTTP method
+            data: Request data for POST/PUT
+            params: Query string parameters
+            
+        Returns:
+            API response data
+        """
+        if self.config['enable_mock_mode']:
+            return self._get_mock_response(endpoint, method, data, params)
+        
+        if method.upper() not in ('GET', 'POST', 'PUT'):
+            return {'error': f"Unsupported HTTP method: {method}", 'status': 'failed'}
+        
+        session = await self._ensure_session()
+        
+        try:
+            async with self._aio_semaphore:
+                await self._rate_limit_check_async()
+                async with session.request(method.upper(), f"{self.api_base_url}{endpoint}",
+                                           params=params, json=data) as response:
+                    response.raise_for_status()
+                    return await response.json()
+            
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            logger.error(f"API call failed: {e}")
+            return {'error': str(e), 'status': 'failed'}
+        except Exception as e:
+            logger.error(f"Unexpected error in API call: {e}")
+            return {'error': str(e), 'status': 'failed'}
+    
+    def _get_mock_response(self, endpoint: str, method: str, data: Dict = None, params: Dict = None) -> Dict:
         """Get mock response for development/testing"""
+        bucket = self._endpoint_bucket(endpoint)
+        
+        rows = None
+        if bucket == 'banks' and params and params.get('location'):
+            rows = self._banks_in_radius(params['location'], float(params.get('radius', 50)))
+        
+        return {**self._build_mock_payload(bucket, rows), 'timestamp': self._now_iso()}
+    
+    def _banks_in_radius(self, location: str, radius_km: float) -> Optional[List[int]]:
+        """Rows of the mock blood banks around a known city (None for an unknown location)"""
+        coords = self._resolve_location(location)
+        if coords is None:
+            return None
+        return self._radius_query(coords[0], coords[1], radius_km)
+    
+    @staticmethod
+    def _endpoint_bucket(endpoint: str) -> str:
+        """Normalize an endpoint to the mock payload it is served from"""
         if 'blood-banks' in endpoint:
-            return {
-                'status': 'success',
-                'data': [self._blood_bank_to_dict(bank) for bank in self.mock_blood_banks],
-                'count': len(self.mock_blood_banks),
-                'timestamp': datetime.now().isoformat()
-            }
+            return 'banks'
         elif 'blood-inventory' in endpoint:
+            return 'inventory'
+        elif 'requests' in endpoint:
+            return 'requests'
+        return 'other'
+    
+    def _build_mock_payload(self, bucket: str, rows: List[int] = None) -> Dict:
+        """Build the (timestamp-free) mock payload for an endpoint bucket, limited to rows if given"""
+        if bucket == 'banks':
+            banks = self._get_serialized_blood_banks(rows)
             return {
                 'status': 'success',
-                'data': self._get_blood_inventory_summary(),
-                'timestamp': datetime.now().isoformat()
+                'data': banks,
+                'count': len(banks)
             }
-        elif 'requests' in endpoint:
+        elif bucket == 'inventory':
             return {
                 'status': 'success',
-                'data': [self._blood_request_to_dict(req) for req in self.mock_requests],
-                'count': len(self.mock_requests),
-                'timestamp': datetime.now().isoformat()
+                'data': self._get_blood_inventory_summary()
             }
-        else:
+        elif bucket == 'requests':
             return {
                 'status': 'success',
-                'data': {'message': 'Mock response for development'},
-                'timestamp': datetime.now().isoformat()
+                'data': self._get_serialized_requests(),
+                'count': len(self.mock_requests)
             }
-    
-    def _blood_bank_to_dict(self, bank: BloodBankInfo) -> Dict:
-        """Convert BloodBankInfo to dictionary"""
         return {
-            'bank_id': bank.bank_id,
-            'name': bank.name,
-            'location': bank.location,
-            'latitude': bank.latitude,
-            'longitude': bank.longitude,
-            'contact_number': bank.contact_number,
-            'email': bank.email,
-            'blood_inventory': bank.blood_inventory,
-            'last_updated': bank.last_updated.isoformat(),
-            'status': bank.status
+            'status': 'success',
+            'data': {'message': 'Mock response for development'}
         }
     
+    def _get_serialized_blood_banks(self, rows: List[int] = None) -> List[Dict]:
+        """Get a copy of the mock blood banks (or just the given rows) as dictionaries, serializing them once"""
+        if self._blood_banks_serialized is None:
+            # One to_builtins call over the whole list instead of one per bank
+            self._blood_banks_serialized = msgspec.to_builtins(self.mock_blood_banks, enc_hook=_enc_hook)
+        return self._copy_rows(self._blood_banks_serialized, rows)
+    
+    def _get_serialized_requests(self, rows: List[int] = None) -> List[Dict]:
+        """Get a copy of the mock blood requests (or just the given rows) as dictionaries, serializing them once"""
+        if self._requests_serialized is None:
+            self._requests_serialized = msgspec.to_builtins(self.mock_requests)
+        return self._copy_rows(self._requests_serialized, rows)
+    
+    @staticmethod
+    def _copy_rows(records: List[Dict], rows: List[int] = None) -> List[Dict]:
+        """Deep-copy the selected records so callers can't mutate the serialized cache"""
+        if rows is not None:
+            records = [records[i] for i in rows]
+        return msgspec.to_builtins(records)
+    
+    def _invalidate_mock_cache(self):
+        """Drop the serialized mock payloads after a create/update call"""
+        # The mock requests themselves never change, so the request frame and
+        # location index built in __init__ stay valid
+        self._blood_banks_serialized = None
+        self._requests_serialized = None
+    
+    def _blood_bank_to_dict(self, bank: BloodBankInfo) -> Dict:
+        """Convert BloodBankInfo to dictionary (datetimes as ISO strings)"""
+        return msgspec.to_builtins(bank, enc_hook=_enc_hook)
+    
     def _blood_request_to_dict(self, request: BloodRequest) -> Dict:
-        """Convert BloodRequest to dictionary"""
-        return {
-            'request_id': request.request_id,
-            'blood_type': request.blood_type,
-            'units_required': request.units_required,
-            'urgency_level': request.urgency_level,
-            'patient_name': request.patient_name,
-            'hospital_name': request.hospital_name,
-            'contact_number': request.contact_number,
-            'location': request.location,
-            'latitude': request.latitude,
-            'longitude': request.longitude,
-            'timestamp': request.timestamp.isoformat(),
-            'status': request.status
-        }
+        """Convert BloodRequest to dictionary (datetimes as ISO strings)"""
+        return msgspec.to_builtins(request)
     
     def get_blood_banks(self, location: str = None, radius_km: float = 50) -> Dict:
         """
@@ -308,11 +607,23 @@ class ERaktKoshService:
         Returns:
             Dictionary with blood bank data
         """
-        endpoint = '/blood-banks'
-        if location:
-            endpoint += f'?location={location}&radius={radius_km}'
+        params = {'location': location, 'radius': radius_km} if location else None
+        return self._make_api_call('/blood-banks', 'GET', params=params)
+    
+    async def get_blood_banks_batch(self, bank_ids: List[str]) -> List[Dict]:
+        """
+        Fetch several blood banks concurrently
         
-        return self._make_api_call(endpoint, 'GET')
+        Args:
+            bank_ids: Blood bank IDs to fetch
+            
+        Returns:
+            List of API responses, in the same order as bank_ids
+        """
+        async with self._session_scope():
+            return await asyncio.gather(*[
+                self._make_api_call_async(f'/blood-banks/{bank_id}') for bank_id in bank_ids
+            ])
     
     def get_blood_inventory(self, bank_id: str = None, blood_type: str = None) -> Dict:
         """
@@ -326,13 +637,10 @@ class ERaktKoshService:
             Dictionary with inventory data
         """
         if bank_id:
-            endpoint = f'/blood-banks/{bank_id}/inventory'
-        else:
-            endpoint = '/blood-inventory'
-            if blood_type:
-                endpoint += f'?blood_type={blood_type}'
+            return self._make_api_call(f'/blood-banks/{bank_id}/inventory', 'GET')
         
-        return self._make_api_call(endpoint, 'GET')
+        params = {'blood_type': blood_type} if blood_type else None
+        return self._make_api_call('/blood-inventory', 'GET', params=params)
     
     def get_blood_requests(self, status: str = None, urgency: str = None) -> Dict:
         """
@@ -345,18 +653,14 @@ class ERaktKoshService:
         Returns:
             Dictionary with request data
         """
-        endpoint = '/blood-requests'
-        params = []
+        params = {}
         
         if status:
-            params.append(f'status={status}')
+            params['status'] = status
         if urgency:
-            params.append(f'urgency={urgency}')
+            params['urgency'] = urgency
         
-        if params:
-            endpoint += '?' + '&'.join(params)
-        
-        return self._make_api_call(endpoint, 'GET')
+        return self._make_api_call('/blood-requests', 'GET', params=params or None)
     
     def create_blood_request(self, request_data: Dict) -> Dict:
         """
@@ -381,7 +685,9 @@ class ERaktKoshService:
         request_data['status'] = 'pending'
         
         # Make API call
-        return self._make_api_call('/blood-requests', 'POST', request_data)
+        response = self._make_api_call('/blood-requests', 'POST', request_data)
+        self._invalidate_mock_cache()
+        return response
     
     def update_blood_request(self, request_id: str, update_data: Dict) -> Dict:
         """
@@ -394,7 +700,9 @@ class ERaktKoshService:
         Returns:
             Dictionary with updated request info
         """
-        return self._make_api_call(f'/blood-requests/{request_id}', 'PUT', update_data)
+        response = self._make_api_call(f'/blood-requests/{request_id}', 'PUT', update_data)
+        self._invalidate_mock_cache()
+        return response
     
     def search_blood_banks(self, blood_type: str, location: str, radius_km: float = 50) -> Dict:
         """
@@ -408,8 +716,8 @@ class ERaktKoshService:
         Returns:
             Dictionary with matching blood banks
         """
-        endpoint = f'/search/blood-banks?blood_type={blood_type}&location={location}&radius={radius_km}'
-        return self._make_api_call(endpoint, 'GET')
+        params = {'blood_type': blood_type, 'location': location, 'radius': radius_km}
+        return self._make_api_call('/search/blood-banks', 'GET', params=params)
     
     def get_blood_availability_summary(self) -> Dict:
         """
@@ -422,27 +730,25 @@ class ERaktKoshService:
     
     def _get_blood_inventory_summary(self) -> Dict:
         """Get mock blood inventory summary"""
-        summary = {}
-        blood_types = ['O+', 'O-', 'A+', 'A-', 'B+', 'B-', 'AB+', 'AB-']
+        if _inv_rollup is not None:
+            totals = np.zeros(len(BLOOD_TYPES), dtype=np.int64)
+            available = np.zeros(len(BLOOD_TYPES), dtype=np.int64)
+            _inv_rollup(self._inv_matrix, self._active_mask, totals, available)
+        else:
+            active = self._inv_matrix[self._active_mask]
+            totals = active.sum(axis=0, dtype=np.int64)
+            available = (active > 0).sum(axis=0)
+        totals = totals.tolist()
+        available = available.tolist()
         
-        for blood_type in blood_types:
-            total_units = 0
-            available_banks = 0
-            
-            for bank in self.mock_blood_banks:
-                if bank.status == 'active':
-                    units = bank.blood_inventory.get(blood_type, 0)
-                    total_units += units
-                    if units > 0:
-                        available_banks += 1
-            
-            summary[blood_type] = {
+        return {
+            blood_type: {
                 'total_units': total_units,
                 'available_banks': available_banks,
                 'average_per_bank': total_units / max(available_banks, 1)
             }
-        
-        return summary
+            for blood_type, total_units, available_banks in zip(BLOOD_TYPES, totals, available)
+        }
     
     def get_emergency_blood_requests(self, location: str = None) -> Dict:
         """
@@ -454,24 +760,77 @@ class ERaktKoshService:
         Returns:
             Dictionary with emergency requests
         """
-        # Filter for high/critical urgency requests
-        emergency_requests = [
-            req for req in self.mock_requests
-            if req.urgency_level in ['HIGH', 'CRITICAL'] and req.status == 'pending'
-        ]
+        # Filter for pending high/critical urgency requests
+        req_df = self._req_df
+        mask = req_df['urgency_level'].isin(['HIGH', 'CRITICAL']) & req_df['status'].eq('pending')
+        
+        mask = mask.to_numpy()
         
         if location:
-            # Simple location filtering (in real implementation, use proper geospatial queries)
-            emergency_requests = [
-                req for req in emergency_requests
-                if location.lower() in req.location.lower()
-            ]
+            # Substring-match the few distinct locations, then take their indexed rows
+            location_lower = location.lower()
+            matching = [rows for loc, rows in self._location_index.items() if location_lower in loc]
+            location_mask = np.zeros(len(mask), dtype=bool)
+            if matching:
+                location_mask[np.concatenate(matching)] = True
+            mask &= location_mask
+        
+        # Copy only the matching rows out of the serialized cache
+        emergency_requests = self._get_serialized_requests(np.flatnonzero(mask).tolist())
         
         return {
             'status': 'success',
-            'data': [self._blood_request_to_dict(req) for req in emergency_requests],
+            'data': emergency_requests,
             'count': len(emergency_requests),
-            'timestamp': datetime.now().isoformat()
+            'timestamp': self._now_iso()
+        }
+    
+    def match_requests_to_banks(self, status: str = 'pending', max_matrix_size: int = 5_000_000) -> Dict:
+        """
+        Pair each blood request with its nearest active blood bank
+        
+        Args:
+            status: Only match requests with this status (None for all)
+            max_matrix_size: Largest requests x banks distance matrix to build;
+                bigger inputs use a kd-tree nearest-neighbour query instead
+            
+        Returns:
+            Dictionary with request/bank pairs and distances in kilometers
+        """
+        req_df = self._req_df
+        if status:
+            req_df = req_df[req_df['status'].eq(status)]
+        
+        active_idx = np.flatnonzero(self._active_mask)
+        if req_df.empty or active_idx.size == 0:
+            return {'status': 'success', 'data': [], 'count': 0, 'timestamp': self._now_iso()}
+        
+        req_lats = req_df['latitude'].to_numpy(dtype=float)
+        req_lons = req_df['longitude'].to_numpy(dtype=float)
+        bank_lats = self._bank_lats[active_idx]
+        bank_lons = self._bank_lons[active_idx]
+        
+        if len(req_df) * active_idx.size <= max_matrix_size:
+            distances = self._haversine_matrix(req_lats, req_lons, bank_lats, bank_lons)
+            nearest = distances.argmin(axis=1)
+            nearest_km = distances[np.arange(len(nearest)), nearest]
+        else:
+            # Too large for a dense matrix: nearest neighbour on unit-sphere chords
+            tree = cKDTree(self._to_unit_xyz(bank_lats, bank_lons))
+            chords, nearest = tree.query(self._to_unit_xyz(req_lats, req_lons))
+            nearest_km = 2 * EARTH_RADIUS_KM * np.arcsin(np.clip(chords / 2, 0.0, 1.0))
+        
+        bank_ids = [self.mock_blood_banks[i].bank_id for i in active_idx[nearest].tolist()]
+        matches = [
+            {'request_id': request_id, 'bank_id': bank_id, 'distance_km': round(distance, 2)}
+            for request_id, bank_id, distance in zip(req_df['request_id'].tolist(), bank_ids, nearest_km.tolist())
+        ]
+        
+        return {
+            'status': 'success',
+            'data': matches,
+            'count': len(matches),
+            'timestamp': self._now_iso()
         }
     
     def get_blood_bank_statistics(self) -> Dict:
@@ -482,16 +841,13 @@ class ERaktKoshService:
             Dictionary with statistics
         """
         total_banks = len(self.mock_blood_banks)
-        active_banks = len([b for b in self.mock_blood_banks if b.status == 'active'])
+        active_banks = int(self._active_mask.sum())
         
         total_requests = len(self.mock_requests)
-        pending_requests = len([r for r in self.mock_requests if r.status == 'pending'])
+        pending_requests = int(self._req_df['status'].eq('pending').sum())
         
-        # Calculate total blood units across all banks
-        total_blood_units = 0
-        for bank in self.mock_blood_banks:
-            if bank.status == 'active':
-                total_blood_units += sum(bank.blood_inventory.values())
+        # Calculate total blood units across all active banks
+        total_blood_units = int(self._inv_matrix[self._active_mask].sum(dtype=np.int64))
         
         return {
             'status': 'success',
@@ -503,7 +859,7 @@ class ERaktKoshService:
                 'pending_requests': pending_requests,
                 'fulfillment_rate': ((total_requests - pending_requests) / total_requests * 100) if total_requests > 0 else 0
             },
-            'timestamp': datetime.now().isoformat()
+            'timestamp': self._now_iso()
         }
     
     def export_data(self, data_type: str, format: str = 'json') -> Dict:
@@ -517,32 +873,23 @@ class ERaktKoshService:
         Returns:
             Dictionary with export data
         """
-        if data_type == 'blood_banks':
-            data = [self._blood_bank_to_dict(bank) for bank in self.mock_blood_banks]
-        elif data_type == 'blood_requests':
-            data = [self._blood_request_to_dict(req) for req in self.mock_requests]
-        elif data_type == 'inventory':
-            data = self._get_blood_inventory_summary()
-        else:
+        data = self._export_records(data_type)
+        if data is None:
             return {'error': f'Unknown data type: {data_type}', 'status': 'failed'}
         
         if format.lower() == 'csv':
-            # Convert to CSV format
-            if isinstance(data, list) and data:
-                csv_data = []
-                headers = list(data[0].keys())
-                csv_data.append(','.join(headers))
-                
-                for item in data:
-                    row = [str(item.get(header, '')) for header in headers]
-                    csv_data.append(','.join(row))
-                
-                return {
-                    'status': 'success',
-                    'format': 'csv',
-                    'data': '\n'.join(csv_data),
-                    'filename': f'eraktkosh_{data_type}_{datetime.now().strftime("%Y%m%d")}.csv'
-                }
+            # Convert to CSV format (pandas handles quoting of embedded commas)
+            if isinstance(data, dict):
+                csv_data = pd.DataFrame.from_dict(data, orient='index').to_csv(index_label='blood_type')
+            else:
+                csv_data = pd.DataFrame(data).to_csv(index=False)
+            
+            return {
+                'status': 'success',
+                'format': 'csv',
+                'data': csv_data,
+                'filename': f'eraktkosh_{data_type}_{datetime.now().strftime("%Y%m%d")}.csv'
+            }
         
         return {
             'status': 'success',
@@ -551,6 +898,37 @@ class ERaktKoshService:
             'filename': f'eraktkosh_{data_type}_{datetime.now().strftime("%Y%m%d")}.json'
         }
     
+    def export_json_bytes(self, data_type: str) -> Dict:
+        """
+        Export data from E-RaktKosh as an encoded JSON document
+        
+        Args:
+            data_type: Type of data to export
+            
+        Returns:
+            Dictionary with the JSON document as bytes, ready to write to a file or response
+        """
+        data = self._export_records(data_type)
+        if data is None:
+            return {'error': f'Unknown data type: {data_type}', 'status': 'failed'}
+        
+        return {
+            'status': 'success',
+            'format': 'json',
+            'data': orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY),
+            'filename': f'eraktkosh_{data_type}_{datetime.now().strftime("%Y%m%d")}.json'
+        }
+    
+    def _export_records(self, data_type: str):
+        """Records for an export data type, or None if the type is unknown"""
+        if data_type == 'blood_banks':
+            return self._get_serialized_blood_banks()
+        elif data_type == 'blood_requests':
+            return self._get_serialized_requests()
+        elif data_type == 'inventory':
+            return self._get_blood_inventory_summary()
+        return None
+    
     def get_api_status(self) -> Dict:
         """
         Check E-RaktKosh API status and connectivity
@@ -560,13 +938,14 @@ class ERaktKoshService:
         """
         try:
             # Try to make a simple API call
+            start_time = time.perf_counter()
             response = self._make_api_call('/health', 'GET')
             
             return {
                 'status': 'success',
                 'api_status': 'connected' if response.get('status') == 'success' else 'error',
-                'response_time': time.time() - self.last_api_call,
-                'rate_limit_remaining': self.config['rate_limit_per_minute'] - self.api_call_count,
+                'response_time': time.perf_counter() - start_time,
+                'rate_limit_remaining': self._refill_bucket(time.monotonic_ns()),
                 'mock_mode': self.config['enable_mock_mode'],
                 'timestamp': datetime.now().isoformat()
             }
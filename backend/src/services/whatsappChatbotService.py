@@ -4,22 +4,66 @@ AI WhatsApp Chatbot Service for ThalaNet Emergency Blood Management Platform
 Provides intelligent responses with patient matching, donation history, and donor suggestions
 """
 
+import os
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
 from typing import Dict, List, Tuple, Optional
-import json
+import orjson
 import re
+import random
 import logging
 from dataclasses import dataclass
 import asyncio
-import requests
-from urllib.parse import quote
+import threading
+import itertools
+import time
+from functools import lru_cache, cached_property
+from collections import OrderedDict, deque
+
+try:
+    from services.asyncSessionMixin import AsyncSessionMixin
+except ImportError:  # run directly as a script from the services directory
+    from asyncSessionMixin import AsyncSessionMixin
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# str.translate table that deletes every non-digit Latin-1 character from a phone number
+_NON_DIGIT_TABLE = {i: None for i in range(256) if not chr(i).isdigit()}
+
+# Blood type mentioned in a message, e.g. "A+", "ab-" or "O+ve"
+_BLOOD_TYPE_RE = re.compile(r'\b(AB[+-]|[ABO][+-])', re.IGNORECASE)
+
+@lru_cache(maxsize=1024)
+def _extract_blood_type_cached(message: str) -> Optional[str]:
+    """Extract the first blood type in a message (memoized for repeated messages)"""
+    match = _BLOOD_TYPE_RE.search(message)
+    return match.group(1).upper() if match else None
+
+# Blood type compatibility: recipient type -> donor types it can receive
+BLOOD_COMPATIBILITY = {
+    'O-': ['O-'],
+    'O+': ['O+', 'O-'],
+    'A-': ['A-', 'O-'],
+    'A+': ['A+', 'A-', 'O+', 'O-'],
+    'B-': ['B-', 'O-'],
+    'B+': ['B+', 'B-', 'O+', 'O-'],
+    'AB-': ['AB-', 'A-', 'B-', 'O-'],
+    'AB+': ['AB+', 'AB-', 'A+', 'A-', 'B+', 'B-', 'O+', 'O-']
+}
+
+# One bit per blood type, and the donor bits each recipient type accepts
+BT_BIT = {'O-': 1, 'O+': 2, 'A-': 4, 'A+': 8, 'B-': 16, 'B+': 32, 'AB-': 64, 'AB+': 128}
+COMPAT_MASK = {
+    recipient: sum(BT_BIT[donor] for donor in donors)
+    for recipient, donors in BLOOD_COMPATIBILITY.items()
+}
+
+# Filler words ignored when normalizing messages for the response cache
+_CACHE_STOPWORDS = frozenset({'a', 'an', 'the', 'i', 'me', 'my', 'to', 'is', 'are', 'please', 'can', 'you', 'do'})
+
 @dataclass
 class ChatMessage:
     """Data class for chat messages"""
@@ -29,6 +73,11 @@ class ChatMessage:
     timestamp: datetime
     message_type: str = 'text'  # text, image, location, etc.
     context: Dict = None
+    
+    @cached_property
+    def text_lower(self) -> str:
+        """Lowercased message text, computed once and shared by the helpers"""
+        return self.message_text.lower()
 
 @dataclass
 class ChatResponse:
@@ -41,7 +90,78 @@ class ChatResponse:
     quick_replies: List[str] = None
     timestamp: datetime = None
 
-class WhatsAppChatbotService:
+@dataclass
+class MessageContext:
+    """Datasets available to response handlers while processing a message"""
+    donors_df: pd.DataFrame = None
+    patients_df: pd.DataFrame = None
+    emergency_requests_df: pd.DataFrame = None
+
+@dataclass(frozen=True)
+class DonorIndex:
+    """Lookups derived from one donors_df, published as a single snapshot"""
+    donors_df: pd.DataFrame
+    phone_index: Dict[str, int]  # cleaned phone -> donor row position
+    phones: pd.Series
+    last_donation: pd.Series
+    bt_bits: np.ndarray
+    eligible: np.ndarray
+
+@dataclass(frozen=True)
+class EmergencyIndex:
+    """Parsed timestamps for one emergency_requests_df"""
+    emergency_requests_df: pd.DataFrame
+    timestamps: pd.Series
+
+# Intent keywords, checked in priority order
+INTENT_KEYWORDS = {
+    'greeting': ['hello', 'hi', 'hey', 'good morning', 'good afternoon', 'good evening'],
+    'donation_info': ['donate', 'donation', 'blood donation', 'how to donate', 'process'],
+    'eligibility': ['eligible', 'can i donate', 'requirements', 'age', 'weight', 'health'],
+    'emergency_request': ['emergency', 'urgent', 'need blood', 'critical', 'help', 'sos'],
+    'donation_history': ['history', 'my donations', 'last donation', 'when can i donate again'],
+    'find_donor': ['find donor', 'search', 'match', 'compatible', 'need donor'],
+    'help': ['help', 'what can you do', 'commands', 'options']
+}
+
+# Keyword -> priority of the first intent that lists it
+_INTENT_ORDER = tuple(INTENT_KEYWORDS)
+_KEYWORD_PRIORITY = {}
+for _priority, _words in enumerate(INTENT_KEYWORDS.values()):
+    for _word in _words:
+        _KEYWORD_PRIORITY.setdefault(_word, _priority)
+
+def _keyword_pattern(keyword: str) -> str:
+    """Whole-word pattern for a keyword whose last word may be inflected (donations, urgently, emergencies)"""
+    if len(keyword.rsplit(' ', 1)[-1]) < 4:
+        # Short words (hi, hey, age, sos) must match exactly, or they would fire inside other words
+        return re.escape(keyword) + r'\b'
+    # Drop a trailing e/y so donate -> donating and emergency -> emergencies still match
+    stem = keyword[:-1] if keyword[-1] in 'ey' else keyword
+    return re.escape(stem) + r'\w*'
+
+# Single matcher over every keyword, one group per keyword. The lookahead reports a
+# keyword at each word start (overlaps included), trying alternatives in priority order.
+_KEYWORDS_BY_PRIORITY = sorted(_KEYWORD_PRIORITY, key=lambda w: (_KEYWORD_PRIORITY[w], -len(w)))
+_GROUP_PRIORITY = [_KEYWORD_PRIORITY[word] for word in _KEYWORDS_BY_PRIORITY]
+_INTENT_MATCHER = re.compile(
+    r'\b(?=' + '|'.join(f'({_keyword_pattern(word)})' for word in _KEYWORDS_BY_PRIORITY) + r')'
+)
+
+@lru_cache(maxsize=16384)
+def _intent_of(text: str) -> str:
+    """Classify normalized (lowercased, stripped) message text into an intent"""
+    best = len(_INTENT_ORDER)
+    for match in _INTENT_MATCHER.finditer(text):
+        best = min(best, _GROUP_PRIORITY[match.lastindex - 1])
+        if best == 0:
+            break
+    return _INTENT_ORDER[best] if best < len(_INTENT_ORDER) else 'unknown'
+
+class WhatsAppChatbotService(AsyncSessionMixin):
+    # Intents whose responses depend only on the message, not on the datasets
+    _CACHEABLE_INTENTS = frozenset({'greeting', 'donation_info', 'eligibility', 'help', 'unknown'})
+    
     def __init__(self, config: Dict = None):
         """
         Initialize the WhatsApp chatbot service
@@ -53,6 +173,21 @@ class WhatsAppChatbotService:
         self.conversation_history = {}
         self.user_profiles = {}
         self.response_templates = self._load_response_templates()
+        self._response_counter = itertools.count(1)
+        
+        # Intent -> (handler(message, ctx), whether it does DataFrame work in a worker thread)
+        self._intent_dispatch = {
+            'greeting': (lambda message, ctx: self._generate_greeting_response(message), False),
+            'donation_info': (lambda message, ctx: self._generate_donation_info_response(message), False),
+            'eligibility': (lambda message, ctx: self._generate_eligibility_response(message), False),
+            'emergency_request': (lambda message, ctx: self._generate_emergency_response(
+                message, ctx.donors_df, ctx.emergency_requests_df), True),
+            'donation_history': (lambda message, ctx: self._generate_history_response(message, ctx.donors_df), True),
+            'find_donor': (lambda message, ctx: self._generate_donor_search_response(
+                message, ctx.donors_df, ctx.patients_df), True),
+            'help': (lambda message, ctx: self._generate_help_response(message), False)
+        }
+        self._default_handler = (lambda message, ctx: self._generate_generic_response(message), False)
         
         # Load ML models and matching system
         self.donor_prediction_model = None
@@ -60,6 +195,25 @@ class WhatsAppChatbotService:
         
         # Initialize WhatsApp Business API client (mock for now)
         self.whatsapp_client = None
+        self._session = None
+        
+        # Optional shared conversation store; entries are queued and pipelined per message
+        self._kv = None
+        self._kv_enabled = bool(self.config.get('redis_url'))
+        self._log_fd = None
+        self._pending_history: List[Tuple[str, Dict]] = []
+        
+        # (intent, normalized tokens) -> (response text, cached at), in LRU order
+        self._response_cache: OrderedDict = OrderedDict()
+        
+        # Serializes index builds from worker threads; readers take the published snapshot
+        self._index_lock = threading.Lock()
+        
+        # Donor lookups, rebuilt when a different donors_df is passed
+        self._donor_index: Optional[DonorIndex] = None
+        
+        # Parsed emergency request timestamps, cached per emergency_requests_df
+        self._emergency_index: Optional[EmergencyIndex] = None
         
         logger.info("WhatsApp Chatbot Service initialized")
     
@@ -74,12 +228,22 @@ class WhatsAppChatbotService:
             'enable_donation_history': True,
             'enable_smart_suggestions': True,
             'language': 'en',
-            'timezone': 'Asia/Kolkata'
+            'timezone': 'Asia/Kolkata',
+            'whatsapp_api_url': None,  # WhatsApp Business API messages endpoint; None logs responses only
+            'whatsapp_access_token': None,
+            'http_connection_limit': 200,
+            'http_keepalive_seconds': 60,
+            'response_cache_size': 4096,
+            'response_cache_ttl_seconds': 300,
+            'redis_url': None,  # e.g. redis://localhost:6379/0 to share history across workers
+            'redis_key_prefix': 'thalanet:',
+            'conversation_log_file': None,  # append-only NDJSON log of history entries
+            'conversation_log_max_bytes': 64 * 1024 * 1024
         }
     
     def _load_response_templates(self) -> Dict:
-        """Load response templates for different scenarios"""
-        return {
+        """Load response templates for different scenarios (as tuples for random.choice)"""
+        templates = {
             'greeting': [
                 "Hello! Welcome to ThalaNet Blood Donation Service. How can I help you today?",
                 "Hi there! I'm your ThalaNet blood donation assistant. What would you like to know?",
@@ -121,11 +285,13 @@ class WhatsAppChatbotService:
                 "I encountered an error. Please rephrase your request or contact support."
             ]
         }
+        
+        return {key: tuple(options) for key, options in templates.items()}
     
-    def process_message(self, message: ChatMessage, 
-                       donors_df: pd.DataFrame = None,
-                       patients_df: pd.DataFrame = None,
-                       emergency_requests_df: pd.DataFrame = None) -> ChatResponse:
+    async def process_message(self, message: ChatMessage, 
+                             donors_df: pd.DataFrame = None,
+                             patients_df: pd.DataFrame = None,
+                             emergency_requests_df: pd.DataFrame = None) -> ChatResponse:
         """
         Process incoming WhatsApp message and generate appropriate response
         
@@ -138,30 +304,40 @@ class WhatsAppChatbotService:
         Returns:
             Chat response object
         """
+        async with self._session_scope():
+            return await self._process_message(message, donors_df, patients_df, emergency_requests_df)
+    
+    async def _process_message(self, message: ChatMessage, donors_df: pd.DataFrame,
+                               patients_df: pd.DataFrame, emergency_requests_df: pd.DataFrame) -> ChatResponse:
+        """Generate, record and deliver the response to one message"""
         try:
             # Update conversation history
             self._update_conversation_history(message)
             
             # Analyze message intent
-            intent = self._analyze_message_intent(message.message_text)
+            intent = self._analyze_message_intent(message.text_lower)
+            
+            # Serve repeat template responses from the cache
+            cache_key = self._response_cache_key(intent, message.text_lower)
+            cached_text = self._get_cached_response(cache_key)
+            
+            # Generate response based on intent (DataFrame lookups run in worker threads)
+            handler, in_thread = self._intent_dispatch.get(intent, self._default_handler)
+            ctx = MessageContext(donors_df, patients_df, emergency_requests_df)
             
-            # Generate response based on intent
-            if intent == 'greeting':
-                response = self._generate_greeting_response(message)
-            elif intent == 'donation_info':
-                response = self._generate_donation_info_response(message)
-            elif intent == 'eligibility':
-                response = self._generate_eligibility_response(message)
-            elif intent == 'emergency_request':
-                response = self._generate_emergency_response(message, donors_df, emergency_requests_df)
-            elif intent == 'donation_history':
-                response = self._generate_history_response(message, donors_df)
-            elif intent == 'find_donor':
-                response = self._generate_donor_search_response(message, donors_df, patients_df)
-            elif intent == 'help':
-                response = self._generate_help_response(message)
+            if cached_text is not None:
+                response = ChatResponse(
+                    response_id=f"RESP_{next(self._response_counter):06d}",
+                    message_id=message.message_id,
+                    response_text=cached_text
+                )
+            elif in_thread:
+                response = await asyncio.to_thread(handler, message, ctx)
             else:
-                response = self._generate_generic_response(message)
+                response = handler(message, ctx)
+            
+            if cache_key is not None and cached_text is None:
+                self._cache_response(cache_key, response.response_text)
             
             # Add quick replies if appropriate
             response.quick_replies = self._generate_quick_replies(intent)
@@ -171,6 +347,11 @@ class WhatsAppChatbotService:
             
             # Store response in conversation history
             self._store_response(message.sender_phone, response)
+            await self._flush_history()
+            
+            # Deliver through the WhatsApp Business API when one is configured
+            if self.config.get('whatsapp_api_url'):
+                await self.send_whatsapp_message(message.sender_phone, response)
             
             logger.info(f"Generated response for message {message.message_id}: {intent}")
             return response
@@ -179,78 +360,284 @@ class WhatsAppChatbotService:
             logger.error(f"Error processing message {message.message_id}: {e}")
             return self._generate_error_response(message)
     
-    def _analyze_message_intent(self, message_text: str) -> str:
+    def _response_cache_key(self, intent: str, text_lower: str) -> Optional[Tuple]:
+        """Cache key for template-only intents, from the message's significant words"""
+        if intent not in self._CACHEABLE_INTENTS:
+            return None
+        tokens = frozenset(re.findall(r'[a-z0-9+-]+', text_lower)) - _CACHE_STOPWORDS
+        return intent, tokens
+    
+    def _get_cached_response(self, key: Optional[Tuple]) -> Optional[str]:
+        """Return a cached response text if it is present and not expired"""
+        if key is None:
+            return None
+        
+        entry = self._response_cache.get(key)
+        if entry is None:
+            return None
+        
+        text, cached_at = entry
+        if time.monotonic() - cached_at > self.config.get('response_cache_ttl_seconds', 300):
+            del self._response_cache[key]
+            return None
+        
+        self._response_cache.move_to_end(key)
+        return text
+    
+    def _cache_response(self, key: Tuple, text: str):
+        """Store a response text, evicting the least recently used entries"""
+        self._response_cache[key] = (text, time.monotonic())
+        self._response_cache.move_to_end(key)
+        while len(self._response_cache) > self.config.get('response_cache_size', 4096):
+            self._response_cache.popitem(last=False)
+    
+    def _session_kwargs(self) -> Dict:
+        """Pooled connector plus the WhatsApp Cloud API bearer token"""
+        kwargs = super()._session_kwargs()
+        if self.config.get('whatsapp_access_token'):
+            kwargs['headers'] = {'Authorization': f"Bearer {self.config['whatsapp_access_token']}"}
+        return kwargs
+    
+    def _reset_loop_resources(self):
+        """Drop the HTTP session and the conversation store client created on the previous loop"""
+        super()._reset_loop_resources()
+        self._kv = None
+    
+    async def aclose(self):
+        """Close the shared HTTP session, conversation store connection and log"""
+        await super().aclose()
+        
+        if self._kv is not None:
+            await self._kv.aclose()
+            self._kv = None
+        
+        if self._log_fd is not None:
+            os.close(self._log_fd)
+            self._log_fd = None
+    
+    async def _ensure_kv(self):
+        """Connect to the Redis conversation store (once per event loop) if one is configured"""
+        self._bind_to_running_loop()
+        if self._kv is None and self._kv_enabled:
+            try:
+                import redis.asyncio as redis
+                self._kv = redis.from_url(self.config['redis_url'])
+            except ImportError:
+                logger.warning("redis is not installed; keeping conversation history in memory only")
+                self._kv_enabled = False
+        return self._kv
+    
+    def _history_key(self, phone: str) -> str:
+        """Redis key holding a user's conversation history"""
+        return f"{self.config.get('redis_key_prefix', 'thalanet:')}conv:{phone}"
+    
+    def _queue_history(self, phone: str, entry: Dict):
+        """Queue a history entry for the conversation log / shared store, if either is configured"""
+        if self._kv_enabled or self.config.get('conversation_log_file'):
+            self._pending_history.append((phone, entry))
+    
+    async def _flush_history(self):
+        """Append queued history entries to the conversation log and the shared store"""
+        pending, self._pending_history = self._pending_history, []
+        if not pending:
+            return
+        
+        if self.config.get('conversation_log_file'):
+            self._append_conversation_log(pending)
+        
+        kv = await self._ensure_kv()
+        if kv is None:
+            return
+        
+        max_history = self.config['max_conversation_history']
+        try:
+            async with kv.pipeline(transaction=False) as pipe:
+                for phone, entry in pending:
+                    pipe.rpush(self._history_key(phone), orjson.dumps(entry, default=str))
+                for phone in {phone for phone, _ in pending}:
+                    pipe.ltrim(self._history_key(phone), -max_history, -1)
+                await pipe.execute()
+        except Exception as e:
+            logger.error(f"Failed to persist conversation history: {e}")
+    
+    def _append_conversation_log(self, pending: List[Tuple[str, Dict]]):
+        """Append entries to the NDJSON conversation log, rotating it past the size limit"""
+        log_file = self.config['conversation_log_file']
+        try:
+            if self._log_fd is None:
+                self._log_fd = os.open(log_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+            
+            os.write(self._log_fd, b''.join(
+                orjson.dumps({'phone': phone, 'entry': entry}, default=str) + b'\n'
+                for phone, entry in pending
+            ))
+            
+            if os.fstat(self._log_fd).st_size >= self.config.get('conversation_log_max_bytes', 64 * 1024 * 1024):
+                os.close(self._log_fd)
+                self._log_fd = None
+                os.replace(log_file, f"{log_file}.1")
+        except OSError as e:
+            logger.error(f"Failed to append to conversation log {log_file}: {e}")
+    
+    def rebuild_state(self, log_file: str = None) -> int:
         """
-        Analyze message text to determine user intent
+        Rebuild conversation history by replaying the conversation log
         
         Args:
-            message_text: Text content of the message
+            log_file: Log to replay (defaults to the configured conversation_log_file);
+                a rotated '<log_file>.1' is replayed first when present
             
         Returns:
-            Intent category string
+            Number of entries replayed
+        """
+        log_file = log_file or self.config.get('conversation_log_file')
+        if not log_file:
+            return 0
+        
+        replayed = 0
+        for path in (f"{log_file}.1", log_file):
+            if not os.path.exists(path):
+                continue
+            with open(path, 'rb') as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    record = orjson.loads(line)
+                    history = self.conversation_history.get(record['phone'])
+                    if history is None:
+                        history = self.conversation_history[record['phone']] = deque(
+                            maxlen=self.config['max_conversation_history']
+                        )
+                    history.append(record['entry'])
+                    replayed += 1
+        
+        logger.info(f"Replayed {replayed} conversation entries from {log_file}")
+        return replayed
+    
+    async def load_conversation_history(self, phone: str) -> List[Dict]:
         """
-        message_lower = message_text.lower().strip()
+        Load a user's conversation history from the shared store into memory
         
-        # Greeting patterns
-        if any(word in message_lower for word in ['hello', 'hi', 'hey', 'good morning', 'good afternoon', 'good evening']):
-            return 'greeting'
+        Args:
+            phone: User phone number
+            
+        Returns:
+            History entries, oldest first
+        """
+        kv = await self._ensure_kv()
+        if kv is not None:
+            entries = [orjson.loads(raw) for raw in await kv.lrange(self._history_key(phone), 0, -1)]
+            self.conversation_history[phone] = deque(entries, maxlen=self.config['max_conversation_history'])
         
-        # Donation information patterns
-        if any(word in message_lower for word in ['donate', 'donation', 'blood donation', 'how to donate', 'process']):
-            return 'donation_info'
+        return list(self.conversation_history.get(phone, []))
+    
+    async def send_whatsapp_message(self, to_phone: str, response: ChatResponse) -> bool:
+        """
+        Send a chat response through the WhatsApp Business API
+        
+        Args:
+            to_phone: Recipient phone number
+            response: Chat response to deliver
+            
+        Returns:
+            True if the message was sent (or logged when no API is configured)
+        """
+        url = self.config.get('whatsapp_api_url')
+        if not url:
+            logger.info(f"WhatsApp message to {to_phone}: {response.response_id}")
+            return True
+        
+        payload = {
+            'messaging_product': 'whatsapp',
+            'to': to_phone.translate(_NON_DIGIT_TABLE),  # digits only, country code kept
+            'type': 'text',
+            'text': {'body': response.response_text}
+        }
+        
+        try:
+            session = await self._ensure_session()
+            async with session.post(url, json=payload) as http_response:
+                http_response.raise_for_status()
+            return True
+        except Exception as e:
+            logger.error(f"Failed to send WhatsApp message {response.response_id}: {e}")
+            return False
+    
+    async def process_batch(self, messages: List[ChatMessage],
+                            donors_df: pd.DataFrame = None,
+                            patients_df: pd.DataFrame = None,
+                            emergency_requests_df: pd.DataFrame = None) -> List[ChatResponse]:
+        """
+        Process a batch of messages concurrently
         
-        # Eligibility patterns
-        if any(word in message_lower for word in ['eligible', 'can i donate', 'requirements', 'age', 'weight', 'health']):
-            return 'eligibility'
+        Conversations with different senders run concurrently; messages from the
+        same sender are handled in order so their history stays consistent.
         
-        # Emergency request patterns
-        if any(word in message_lower for word in ['emergency', 'urgent', 'need blood', 'critical', 'help', 'sos']):
-            return 'emergency_request'
+        Args:
+            messages: Incoming chat messages
+            donors_df: DataFrame of donors (for matching)
+            patients_df: DataFrame of patients (for matching)
+            emergency_requests_df: DataFrame of emergency requests
+            
+        Returns:
+            Chat responses, in the same order as messages
+        """
+        responses: List[Optional[ChatResponse]] = [None] * len(messages)
         
-        # Donation history patterns
-        if any(word in message_lower for word in ['history', 'my donations', 'last donation', 'when can i donate again']):
-            return 'donation_history'
+        conversations: Dict[str, List[int]] = {}
+        for i, message in enumerate(messages):
+            conversations.setdefault(message.sender_phone, []).append(i)
         
-        # Donor search patterns
-        if any(word in message_lower for word in ['find donor', 'search', 'match', 'compatible', 'need donor']):
-            return 'find_donor'
+        async def run_conversation(indices: List[int]):
+            for i in indices:
+                responses[i] = await self.process_message(messages[i], donors_df, patients_df, emergency_requests_df)
         
-        # Help patterns
-        if any(word in message_lower for word in ['help', 'what can you do', 'commands', 'options']):
-            return 'help'
+        async with self._session_scope():
+            await asyncio.gather(*(run_conversation(indices) for indices in conversations.values()))
+        return responses
+    
+    def _analyze_message_intent(self, text_lower: str) -> str:
+        """
+        Analyze message text to determine user intent
         
-        return 'unknown'
+        Args:
+            text_lower: Lowercased text content of the message
+            
+        Returns:
+            Intent category string
+        """
+        return _intent_of(text_lower.strip())
     
     def _generate_greeting_response(self, message: ChatMessage) -> ChatResponse:
         """Generate greeting response"""
-        greeting = np.random.choice(self.response_templates['greeting'])
+        greeting = random.choice(self.response_templates['greeting'])
         
         return ChatResponse(
-            response_id=f"RESP_{len(self.conversation_history.get(message.sender_phone, [])) + 1:06d}",
+            response_id=f"RESP_{next(self._response_counter):06d}",
             message_id=message.message_id,
             response_text=greeting
         )
     
     def _generate_donation_info_response(self, message: ChatMessage) -> ChatResponse:
         """Generate donation information response"""
-        info = np.random.choice(self.response_templates['donation_info'])
+        info = random.choice(self.response_templates['donation_info'])
         
         response_text = f"{info}\n\nWould you like to know about eligibility requirements or schedule a donation?"
         
         return ChatResponse(
-            response_id=f"RESP_{len(self.conversation_history.get(message.sender_phone, [])) + 1:06d}",
+            response_id=f"RESP_{next(self._response_counter):06d}",
             message_id=message.message_id,
             response_text=response_text
         )
     
     def _generate_eligibility_response(self, message: ChatMessage) -> ChatResponse:
         """Generate eligibility information response"""
-        eligibility = np.random.choice(self.response_templates['eligibility'])
+        eligibility = random.choice(self.response_templates['eligibility'])
         
         response_text = f"{eligibility}\n\nWould you like me to check if you're eligible based on your profile?"
         
         return ChatResponse(
-            response_id=f"RESP_{len(self.conversation_history.get(message.sender_phone, [])) + 1:06d}",
+            response_id=f"RESP_{next(self._response_counter):06d}",
             message_id=message.message_id,
             response_text=response_text
         )
@@ -259,7 +646,7 @@ class WhatsAppChatbotService:
                                    donors_df: pd.DataFrame,
                                    emergency_requests_df: pd.DataFrame) -> ChatResponse:
         """Generate emergency response with donor matching"""
-        emergency_msg = np.random.choice(self.response_templates['emergency_request'])
+        emergency_msg = random.choice(self.response_templates['emergency_request'])
         
         # Check for recent emergency requests
         recent_emergencies = self._find_recent_emergencies(message.sender_phone, emergency_requests_df)
@@ -276,7 +663,7 @@ class WhatsAppChatbotService:
             response_text = f"{emergency_msg}\n\nI don't see any recent emergency requests from your number. Would you like to report a new emergency?"
         
         return ChatResponse(
-            response_id=f"RESP_{len(self.conversation_history.get(message.sender_phone, [])) + 1:06d}",
+            response_id=f"RESP_{next(self._response_counter):06d}",
             message_id=message.message_id,
             response_text=response_text
         )
@@ -299,7 +686,7 @@ class WhatsAppChatbotService:
             # Check if eligible to donate again
             if last_donation != 'Unknown':
                 try:
-                    last_date = pd.to_datetime(last_donation)
+                    last_date = self._parse_donation_date(last_donation)
                     days_since = (datetime.now() - last_date).days
                     
                     if days_since >= 56:
@@ -313,7 +700,7 @@ class WhatsAppChatbotService:
             response_text = "I couldn't find your donation history. Are you a registered donor? You can register by providing your details."
         
         return ChatResponse(
-            response_id=f"RESP_{len(self.conversation_history.get(message.sender_phone, [])) + 1:06d}",
+            response_id=f"RESP_{next(self._response_counter):06d}",
             message_id=message.message_id,
             response_text=response_text
         )
@@ -345,17 +732,17 @@ class WhatsAppChatbotService:
             response_text += "Please specify the blood type you're looking for (e.g., 'Find A+ donor' or 'Need O- blood')."
         
         return ChatResponse(
-            response_id=f"RESP_{len(self.conversation_history.get(message.sender_phone, [])) + 1:06d}",
+            response_id=f"RESP_{next(self._response_counter):06d}",
             message_id=message.message_id,
             response_text=response_text
         )
     
     def _generate_help_response(self, message: ChatMessage) -> ChatResponse:
         """Generate help response"""
-        help_text = np.random.choice(self.response_templates['help'])
+        help_text = random.choice(self.response_templates['help'])
         
         return ChatResponse(
-            response_id=f"RESP_{len(self.conversation_history.get(message.sender_phone, [])) + 1:06d}",
+            response_id=f"RESP_{next(self._response_counter):06d}",
             message_id=message.message_id,
             response_text=help_text
         )
@@ -366,17 +753,17 @@ class WhatsAppChatbotService:
         response_text += "You can ask me about:\n• Donation process\n• Eligibility\n• Emergency requests\n• Your donation history\n• Finding donors"
         
         return ChatResponse(
-            response_id=f"RESP_{len(self.conversation_history.get(message.sender_phone, [])) + 1:06d}",
+            response_id=f"RESP_{next(self._response_counter):06d}",
             message_id=message.message_id,
             response_text=response_text
         )
     
     def _generate_error_response(self, message: ChatMessage) -> ChatResponse:
         """Generate error response"""
-        error_msg = np.random.choice(self.response_templates['error'])
+        error_msg = random.choice(self.response_templates['error'])
         
         return ChatResponse(
-            response_id=f"RESP_{len(self.conversation_history.get(message.sender_phone, [])) + 1:06d}",
+            response_id=f"RESP_{next(self._response_counter):06d}",
             message_id=message.message_id,
             response_text=error_msg
         )
@@ -397,111 +784,172 @@ class WhatsAppChatbotService:
     
     def _update_conversation_history(self, message: ChatMessage):
         """Update conversation history for a user"""
-        if message.sender_phone not in self.conversation_history:
-            self.conversation_history[message.sender_phone] = []
+        history = self.conversation_history.get(message.sender_phone)
+        if history is None:
+            # Bounded ring buffer: the oldest entries drop off as new ones arrive
+            history = self.conversation_history[message.sender_phone] = deque(
+                maxlen=self.config['max_conversation_history']
+            )
         
         # Add message to history
-        self.conversation_history[message.sender_phone].append({
+        entry = {
             'message_id': message.message_id,
             'text': message.message_text,
             'timestamp': message.timestamp.isoformat(),
             'type': 'user'
-        })
+        }
+        history.append(entry)
         
-        # Limit history size
-        if len(self.conversation_history[message.sender_phone]) > self.config['max_conversation_history']:
-            self.conversation_history[message.sender_phone] = self.conversation_history[message.sender_phone][-self.config['max_conversation_history']:]
+        self._queue_history(message.sender_phone, entry)
     
     def _store_response(self, sender_phone: str, response: ChatResponse):
         """Store bot response in conversation history"""
         if sender_phone in self.conversation_history:
-            self.conversation_history[sender_phone].append({
+            entry = {
                 'response_id': response.response_id,
                 'text': response.response_text,
                 'timestamp': response.timestamp.isoformat(),
                 'type': 'bot',
                 'quick_replies': response.quick_replies
-            })
+            }
+            self.conversation_history[sender_phone].append(entry)
+            
+            self._queue_history(sender_phone, entry)
     
     def _find_recent_emergencies(self, phone: str, emergency_requests_df: pd.DataFrame) -> List[Dict]:
         """Find recent emergency requests"""
         if emergency_requests_df is None:
             return []
         
+        index = self._ensure_emergency_index(emergency_requests_df)
+        
         # Look for emergencies in the last 24 hours
-        current_time = datetime.now()
-        recent_emergencies = []
+        cutoff = datetime.now() - timedelta(hours=24)
+        recent = emergency_requests_df.loc[index.timestamps >= cutoff]
         
-        for _, emergency in emergency_requests_df.iterrows():
-            try:
-                emergency_time = pd.to_datetime(emergency['timestamp'])
-                if (current_time - emergency_time).total_seconds() <= 86400:  # 24 hours
-                    recent_emergencies.append(emergency.to_dict())
-            except:
-                continue
+        return recent.to_dict('records')
+    
+    def _ensure_emergency_index(self, emergency_requests_df: pd.DataFrame) -> EmergencyIndex:
+        """Parse emergency request timestamps once per emergency_requests_df"""
+        index = self._emergency_index
+        if index is not None and index.emergency_requests_df is emergency_requests_df:
+            return index
         
-        return recent_emergencies
+        with self._index_lock:
+            index = self._emergency_index
+            if index is not None and index.emergency_requests_df is emergency_requests_df:
+                return index
+            
+            if 'timestamp' in emergency_requests_df.columns:
+                timestamps = pd.to_datetime(emergency_requests_df['timestamp'], errors='coerce')
+            else:
+                timestamps = pd.Series(pd.NaT, index=emergency_requests_df.index)
+            
+            index = self._emergency_index = EmergencyIndex(emergency_requests_df, timestamps)
+            return index
     
     def _find_donor_profile(self, phone: str, donors_df: pd.DataFrame) -> Optional[Dict]:
         """Find donor profile by phone number"""
         if donors_df is None:
             return None
         
+        index = self._ensure_donor_index(donors_df)
+        
         # Clean phone number for matching
         clean_phone = self._clean_phone_number(phone)
         
-        for _, donor in donors_df.iterrows():
-            donor_phone = self._clean_phone_number(donor.get('contact_number', ''))
-            if clean_phone in donor_phone or donor_phone in clean_phone:
-                return donor.to_dict()
+        idx = index.phone_index.get(clean_phone)
+        if idx is None:
+            # No exact match: fall back to partial matching in either direction
+            donor_phones = index.phones
+            partial = donor_phones.str.contains(clean_phone, regex=False) | donor_phones.map(lambda p: p in clean_phone)
+            if not partial.any():
+                return None
+            idx = int(partial.to_numpy().argmax())
+        
+        # Positional lookup, so duplicate index labels still yield a single donor
+        return donors_df.iloc[idx].to_dict()
+    
+    def _ensure_donor_index(self, donors_df: pd.DataFrame) -> DonorIndex:
+        """Return the donor lookups for donors_df, building them unless it is already indexed"""
+        index = self._donor_index
+        if index is not None and index.donors_df is donors_df:
+            return index
+        
+        with self._index_lock:
+            index = self._donor_index
+            if index is None or index.donors_df is not donors_df:
+                # Published in one assignment so readers never see a half-built index
+                index = self._donor_index = self._build_donor_index(donors_df)
+            return index
+    
+    def _build_donor_index(self, donors_df: pd.DataFrame) -> DonorIndex:
+        """Build the cleaned-phone lookup and parsed donation dates for donors_df"""
+        if 'contact_number' in donors_df.columns:
+            phones = donors_df['contact_number'].fillna('').astype(str)
+        else:
+            phones = pd.Series('', index=donors_df.index)
+        cleaned = phones.str.translate(_NON_DIGIT_TABLE).str.replace(r'^91(?=\d{9})', '', regex=True)
+        
+        # Keep the first donor for duplicate numbers, as the row scan did
+        phone_index = dict(zip(cleaned.tolist()[::-1], range(len(donors_df) - 1, -1, -1)))
         
-        return None
+        # Parsed donation dates for recency ranking
+        if 'last_donation_date' in donors_df.columns:
+            last_donation = pd.to_datetime(donors_df['last_donation_date'], errors='coerce')
+        else:
+            last_donation = pd.Series(pd.NaT, index=donors_df.index)
+        
+        # Blood type as a one-byte bit per donor, plus which donors are available and healthy
+        if 'blood_type' in donors_df.columns:
+            bt_bits = donors_df['blood_type'].astype(object).map(BT_BIT).fillna(0).to_numpy(dtype=np.uint8)
+        else:
+            bt_bits = np.zeros(len(donors_df), dtype=np.uint8)
+        
+        eligible = np.ones(len(donors_df), dtype=bool)
+        for column, value in (('availability_status', 'Available'), ('health_conditions', 'None')):
+            eligible &= donors_df[column].eq(value).to_numpy() if column in donors_df.columns else False
+        
+        return DonorIndex(donors_df, phone_index, cleaned, last_donation, bt_bits, eligible)
     
     def _find_compatible_donors(self, blood_type: str, donors_df: pd.DataFrame) -> List[Dict]:
         """Find compatible donors for a blood type"""
         if donors_df is None:
             return []
         
-        # Blood type compatibility matrix
-        compatibility = {
-            'O-': ['O-'],
-            'O+': ['O+', 'O-'],
-            'A-': ['A-', 'O-'],
-            'A+': ['A+', 'A-', 'O+', 'O-'],
-            'B-': ['B-', 'O-'],
-            'B+': ['B+', 'B-', 'O+', 'O-'],
-            'AB-': ['AB-', 'A-', 'B-', 'O-'],
-            'AB+': ['AB+', 'AB-', 'A+', 'A-', 'B+', 'B-', 'O+', 'O-']
-        }
+        compatible_mask = COMPAT_MASK.get(blood_type, 0)
+        if not compatible_mask:
+            return []
         
-        compatible_types = compatibility.get(blood_type, [])
-        compatible_donors = []
+        index = self._ensure_donor_index(donors_df)
         
-        for _, donor in donors_df.iterrows():
-            if (donor['blood_type'] in compatible_types and 
-                donor['availability_status'] == 'Available' and
-                donor['health_conditions'] == 'None'):
-                compatible_donors.append(donor.to_dict())
+        # Compatible, available and healthy donors, in row order
+        candidates = np.flatnonzero(((index.bt_bits & compatible_mask) != 0) & index.eligible)
         
-        # Sort by last donation date (most recent first)
-        compatible_donors.sort(key=lambda x: x.get('last_donation_date', ''), reverse=True)
+        # Most recent donation first (ranked by row position, so duplicate labels are safe)
+        last_donation = pd.Series(index.last_donation.to_numpy()[candidates], index=candidates)
+        top = last_donation.nlargest(10).index
         
-        return compatible_donors[:10]
+        return donors_df.iloc[top].to_dict('records')
     
     def _extract_blood_type(self, message: str) -> Optional[str]:
         """Extract blood type from message text"""
-        blood_types = ['O+', 'O-', 'A+', 'A-', 'B+', 'B-', 'AB+', 'AB-']
-        
-        for blood_type in blood_types:
-            if blood_type.lower() in message.lower():
-                return blood_type
-        
-        return None
+        return _extract_blood_type_cached(message)
+    
+    @staticmethod
+    def _parse_donation_date(value) -> datetime:
+        """Parse a donation date, using the C-level ISO parser for the common YYYY-MM-DD form"""
+        if isinstance(value, datetime):
+            return value
+        try:
+            return datetime.fromisoformat(str(value))
+        except ValueError:
+            return pd.to_datetime(value).to_pydatetime()
     
     def _clean_phone_number(self, phone: str) -> str:
         """Clean phone number for matching"""
         # Remove all non-digit characters
-        cleaned = re.sub(r'\D', '', phone)
+        cleaned = phone.translate(_NON_DIGIT_TABLE)
         
         # Remove country code if present
         if cleaned.startswith('91') and len(cleaned) > 10:
@@ -520,7 +968,7 @@ class WhatsAppChatbotService:
         topics = []
         for item in history:
             if item['type'] == 'user':
-                intent = self._analyze_message_intent(item['text'])
+                intent = self._analyze_message_intent(item['text'].lower())
                 topics.append(intent)
         
         return {
@@ -534,7 +982,7 @@ class WhatsAppChatbotService:
     def save_conversation_data(self, output_file: str = "whatsapp_conversations.json"):
         """Save conversation data to JSON file"""
         data = {
-            'conversations': self.conversation_history,
+            'conversations': {phone: list(history) for phone, history in self.conversation_history.items()},
             'user_profiles': self.user_profiles,
             'statistics': {
                 'total_users': len(self.conversation_history),
@@ -543,11 +991,19 @@ class WhatsAppChatbotService:
             }
         }
         
-        with open(output_file, 'w') as f:
-            json.dump(data, f, indent=2, default=str)
+        with open(output_file, 'wb') as f:
+            f.write(orjson.dumps(data, default=str, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
         
         logger.info(f"Conversation data saved to {output_file}")
 
+def install_event_loop_policy():
+    """Use uvloop's event loop when it is installed; otherwise keep asyncio's default"""
+    try:
+        import uvloop
+        asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    except ImportError:
+        pass
+
 def main():
     """Example usage of the WhatsApp chatbot service"""
     print("WhatsApp Chatbot Service")
@@ -572,13 +1028,13 @@ def main():
         
         print("Processing test messages...")
         
-        for message in test_messages:
+        install_event_loop_policy()
+        responses = asyncio.run(chatbot.process_batch(
+            test_messages, donors_df, patients_df, emergency_requests_df
+        ))
+        
+        for message, response in zip(test_messages, responses):
             print(f"\nUser: {message.message_text}")
-            
-            response = chatbot.process_message(
-                message, donors_df, patients_df, emergency_requests_df
-            )
-            
             print(f"Bot: {response.response_text}")
             if response.quick_replies:
                 print(f"Quick Replies: {', '.join(response.quick_replies)}")
@@ -1,10 +1,18 @@
 import pandas as pd
 
+def read_csv(path):
+    """Read a CSV with the multithreaded Arrow parser when pyarrow is installed"""
+    try:
+        import pyarrow  # noqa: F401
+        return pd.read_csv(path, engine="pyarrow", dtype_backend="pyarrow")
+    except ImportError:
+        return pd.read_csv(path)
+
 # Load datasets
-donors = pd.read_csv("data/donors.csv")
-patients = pd.read_csv("data/patients.csv")
-requests = pd.read_csv("data/emergency_requests.csv")
-historical = pd.read_csv("data/historical_donations.csv")
+donors = read_csv("data/donors.csv")
+patients = read_csv("data/patients.csv")
+requests = read_csv("data/emergency_requests.csv")
+historical = read_csv("data/historical_donations.csv")
 
 # Quick glance at first 5 rows
 print("=== DONORS ===")
@@ -7,16 +7,73 @@ Generates realistic datasets for donors, patients, emergency requests, and histo
 import pandas as pd
 import numpy as np
 import random
-from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
+from typing import Dict
+
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pacsv
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+# Optional JIT for the donor categorical/availability pass; NumPy is used without numba
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+
+if njit is not None:
+    @njit(parallel=True, cache=True)
+    def _sample_donor_categories(city_u, health_u, last_days, city_cdf, health_cdf, healthy_idx):
+        """Map uniform draws to category indices and compute base availability in one pass"""
+        n = city_u.shape[0]
+        city_idx = np.empty(n, np.int64)
+        health_idx = np.empty(n, np.int64)
+        availability = np.empty(n, np.float32)
+        for i in prange(n):
+            city_idx[i] = np.searchsorted(city_cdf, city_u[i])
+            health_idx[i] = np.searchsorted(health_cdf, health_u[i])
+            avail = 1.0 if last_days[i] >= 56 else 0.0
+            if health_idx[i] != healthy_idx:
+                avail *= 0.3
+            availability[i] = avail
+        return city_idx, health_idx, availability
+else:
+    _sample_donor_categories = None
+
+# Datasets that each get an independent child RNG stream
+DATASETS = ('donors', 'patients', 'emergency_requests', 'historical_donations')
+
+
+def write_csv(df: pd.DataFrame, path, header: bool = True):
+    """Write a DataFrame as CSV (to a path or open binary file) with Arrow's writer when available"""
+    if PYARROW_AVAILABLE:
+        pacsv.write_csv(pa.Table.from_pandas(df, preserve_index=False), path,
+                        pacsv.WriteOptions(include_header=header))
+    else:
+        df.to_csv(path, index=False, header=header)
+
+
+def _generate_in_worker(seed: int, dataset: str, count: int) -> pd.DataFrame:
+    """Generate one dataset in a worker process from its own deterministic stream"""
+    generator = SyntheticDataGenerator(seed)
+    return getattr(generator, f"generate_{dataset}")(count)
+
 
 class SyntheticDataGenerator:
     def __init__(self, seed: int = 42):
         """Initialize the synthetic data generator with a seed for reproducibility"""
+        # Legacy global seeds are kept for third-party code that still draws from them
         np.random.seed(seed)
         random.seed(seed)
         self.seed = seed
         
+        # One spawned PCG64 stream per dataset, so output doesn't depend on call order or process
+        self.seed_sequences = dict(zip(DATASETS, np.random.SeedSequence(seed).spawn(len(DATASETS))))
+        self.rngs = {name: np.random.default_rng(ss) for name, ss in self.seed_sequences.items()}
+        
         # Blood type distribution (realistic Indian population)
         self.blood_type_distribution = {
             'O+': 0.38, 'B+': 0.32, 'A+': 0.22, 'AB+': 0.08,
@@ -38,195 +95,282 @@ class SyntheticDataGenerator:
             'None', 'Diabetes', 'Hypertension', 'Anemia', 'HIV/AIDS', 
             'Hepatitis', 'Malaria', 'Tuberculosis', 'Cancer', 'Heart Disease'
         ]
+        self.health_conditions_arr = np.array(self.health_conditions)
+        self.health_cdf = self._build_cdf([0.7, 0.08, 0.07, 0.05, 0.02, 0.02, 0.02, 0.02, 0.01, 0.01])
+        self.healthy_idx = self.health_conditions.index('None')
         
         # Urgency levels
         self.urgency_levels = ['LOW', 'MEDIUM', 'HIGH', 'CRITICAL']
         
-    def generate_donors(self, count: int = 1000) -> pd.DataFrame:
+        # [low, high) draw ranges indexed by urgency code (position in urgency_levels)
+        self.patient_deadline_days = np.array([[7, 30], [3, 7], [1, 3], [1, 2]])
+        self.request_age_hours = np.array([[24, 168], [6, 24], [1, 6], [0, 1]])
+        self.patient_urgency_cdf = self._build_cdf([0.3, 0.4, 0.2, 0.1])
+        self.request_urgency_cdf = self._build_cdf([0.1, 0.2, 0.4, 0.3])
+        
+        # Remaining fixed labels and distributions, so generators only draw and index
+        self.genders = ['Male', 'Female']
+        self.donor_gender_cdf = self._build_cdf([0.6, 0.4])
+        self.patient_gender_cdf = self._build_cdf([0.52, 0.48])
+        self.request_statuses = ['Active', 'Fulfilled', 'Expired']
+        self.request_status_cdf = self._build_cdf([0.6, 0.3, 0.1])
+        self.hospital_names = self._sequence_labels('Hospital_', 20)
+        self.contact_persons = np.char.add('Dr. ', np.array(['Sharma', 'Patel', 'Singh', 'Kumar', 'Verma']))
+        
+        # Alias table for blood types; CDFs and city columns for searchsorted sampling
+        self.blood_types_arr = np.array(list(self.blood_type_distribution.keys()))
+        self.blood_alias_prob, self.blood_alias = self._build_alias_table(list(self.blood_type_distribution.values()))
+        self.city_cdf = self._build_cdf([c['weight'] for c in self.cities])
+        self.city_names = np.array([f"{c['name']}, India" for c in self.cities])
+        self.city_lat = np.array([c['lat'] for c in self.cities])
+        self.city_lon = np.array([c['lon'] for c in self.cities])
+    
+    @staticmethod
+    def _build_cdf(weights) -> np.ndarray:
+        """Normalize weights into a cumulative distribution ending exactly at 1.0"""
+        cdf = np.cumsum(np.asarray(weights, dtype=float))
+        cdf /= cdf[-1]
+        cdf[-1] = 1.0
+        return cdf
+    
+    @staticmethod
+    def _sample_codes(rng: np.random.Generator, cdf: np.ndarray, count: int) -> np.ndarray:
+        """Draw count category codes from a precomputed CDF"""
+        return np.searchsorted(cdf, rng.random(count))
+    
+    @staticmethod
+    def _build_alias_table(weights):
+        """Build Vose alias tables so each categorical sample costs O(1)"""
+        scaled = np.asarray(weights, dtype=float)
+        scaled = scaled / scaled.sum() * len(scaled)
+        prob = np.ones(len(scaled))
+        alias = np.arange(len(scaled))
+        
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            under, over = small.pop(), large.pop()
+            prob[under], alias[under] = scaled[under], over
+            scaled[over] -= 1.0 - scaled[under]
+            (small if scaled[over] < 1.0 else large).append(over)
+        return prob, alias
+    
+    def _sample_blood_types(self, rng: np.random.Generator, count: int) -> np.ndarray:
+        """Draw count blood type codes from the alias table"""
+        column = rng.integers(0, len(self.blood_alias), count)
+        return np.where(rng.random(count) < self.blood_alias_prob[column], column, self.blood_alias[column])
+    
+    @staticmethod
+    def _sequence_labels(prefix: str, count: int, width: int = 0, start: int = 1) -> np.ndarray:
+        """Build labels like DON_000001 for start..start+count-1 without per-row formatting"""
+        numbers = np.arange(start, start + count).astype(str)
+        if width:
+            numbers = np.char.zfill(numbers, width)
+        return np.char.add(prefix, numbers)
+    
+    @staticmethod
+    def _contact_numbers(rng: np.random.Generator, count: int) -> np.ndarray:
+        """Draw count Indian mobile numbers formatted as +91-XXXXXXXXXX"""
+        return np.char.add('+91-', rng.integers(7000000000, 9999999999, count, endpoint=True).astype(str))
+    
+    def generate_donors(self, count: int = 1000, id_offset: int = 0) -> pd.DataFrame:
         """Generate synthetic donor data"""
         print(f"Generating {count} donor records...")
-        donors = []
-
-        # Normalize blood type probabilities
-        blood_types = list(self.blood_type_distribution.keys())
-        blood_probs = np.array(list(self.blood_type_distribution.values()))
-        blood_probs = blood_probs / blood_probs.sum()
-
-        # Normalize city weights
-        city_weights = np.array([c['weight'] for c in self.cities])
-        city_weights = city_weights / city_weights.sum()
-        
-        for i in range(count):
-            age = max(18, min(65, int(np.random.normal(35, 12))))
-            gender = np.random.choice(['Male', 'Female'], p=[0.6, 0.4])
-            blood_type = np.random.choice(blood_types, p=blood_probs)
-            city = np.random.choice(self.cities, p=city_weights)
-            location = f"{city['name']}, India"
-            
-            last_donation_days = np.random.exponential(180)
-            last_donation_date = datetime.now() - timedelta(days=int(last_donation_days))
-            days_since_donation = (datetime.now() - last_donation_date).days
-            base_availability = 1.0 if days_since_donation >= 56 else 0.0
-            
-            health_condition = np.random.choice(
-                self.health_conditions,
-                p=[0.7, 0.08, 0.07, 0.05, 0.02, 0.02, 0.02, 0.02, 0.01, 0.01]
+        rng = self.rngs['donors']
+        
+        # Draw every column for the whole batch at once
+        donation_frequency = rng.poisson(2, count).astype(np.int8)
+        responsiveness = rng.beta(2, 2, count).astype(np.float32)
+        ages = np.clip(rng.normal(35, 12, count).astype(int), 18, 65)
+        gender_code = self._sample_codes(rng, self.donor_gender_cdf, count)
+        blood_idx = self._sample_blood_types(rng, count)
+        city_u = rng.random(count)
+        
+        last_days = rng.exponential(180, count).astype(int)
+        last_dates = pd.Timestamp.now().normalize() - pd.to_timedelta(last_days, unit='D')
+        health_u = rng.random(count)
+        
+        # Draws stay on the seeded stream for reproducibility; numba only fuses the lookups
+        if _sample_donor_categories is not None:
+            city_idx, health_idx, base_availability = _sample_donor_categories(
+                city_u, health_u, last_days, self.city_cdf, self.health_cdf, self.healthy_idx
             )
-            if health_condition != 'None':
-                base_availability *= 0.3
-            
-            donation_frequency = np.random.poisson(2)
-            responsiveness = np.random.beta(2, 2)
-            contact_number = f"+91-{random.randint(7000000000, 9999999999)}"
-            
-            donor = {
-                'donor_id': f"DON_{i+1:06d}",
-                'name': f"Donor_{i+1}",
-                'age': age,
-                'gender': gender,
-                'blood_type': blood_type,
-                'location': location,
-                'latitude': city['lat'] + np.random.normal(0, 0.01),
-                'longitude': city['lon'] + np.random.normal(0, 0.01),
-                'last_donation_date': last_donation_date.strftime('%Y-%m-%d'),
-                'availability_status': 'Available' if base_availability > 0.5 else 'Unavailable',
-                'health_conditions': health_condition,
-                'contact_number': contact_number,
-                'donation_frequency': donation_frequency,
-                'responsiveness_score': responsiveness,
-                'base_availability_score': base_availability
-            }
-            donors.append(donor)
-        
-        df = pd.DataFrame(donors)
+        else:
+            city_idx = np.searchsorted(self.city_cdf, city_u)
+            health_idx = np.searchsorted(self.health_cdf, health_u)
+            base_availability = (last_days >= 56).astype(np.float32)
+            base_availability *= np.where(health_idx == self.healthy_idx, np.float32(1.0), np.float32(0.3))
+        
+        df = pd.DataFrame({
+            'donor_id': self._sequence_labels('DON_', count, 6, id_offset + 1),
+            'name': self._sequence_labels('Donor_', count, start=id_offset + 1),
+            'age': ages.astype(np.int8),
+            'gender': pd.Categorical.from_codes(gender_code, self.genders),
+            'blood_type': pd.Categorical.from_codes(blood_idx, self.blood_types_arr),
+            'location': pd.Categorical.from_codes(city_idx, self.city_names),
+            'latitude': (self.city_lat[city_idx] + rng.normal(0, 0.01, count)).astype(np.float32),
+            'longitude': (self.city_lon[city_idx] + rng.normal(0, 0.01, count)).astype(np.float32),
+            'last_donation_date': last_dates.strftime('%Y-%m-%d'),
+            'availability_status': np.where(base_availability > 0.5, 'Available', 'Unavailable'),
+            'health_conditions': pd.Categorical.from_codes(health_idx, self.health_conditions_arr),
+            'contact_number': self._contact_numbers(rng, count),
+            'donation_frequency': donation_frequency,
+            'responsiveness_score': responsiveness,
+            'base_availability_score': base_availability
+        })
         print(f"Generated {len(df)} donor records")
         return df
 
-    def generate_patients(self, count: int = 500) -> pd.DataFrame:
+    def generate_patients(self, count: int = 500, id_offset: int = 0) -> pd.DataFrame:
         """Generate synthetic patient data"""
         print(f"Generating {count} patient records...")
-        patients = []
-
-        blood_types = list(self.blood_type_distribution.keys())
-        blood_probs = np.array(list(self.blood_type_distribution.values()))
-        blood_probs = blood_probs / blood_probs.sum()
-        city_weights = np.array([c['weight'] for c in self.cities])
-        city_weights = city_weights / city_weights.sum()
-        
-        for i in range(count):
-            age = max(1, min(85, int(np.random.normal(45, 20))))
-            gender = np.random.choice(['Male', 'Female'], p=[0.52, 0.48])
-            blood_type_required = np.random.choice(blood_types, p=blood_probs)
-            city = np.random.choice(self.cities, p=city_weights)
-            location = f"{city['name']}, India"
-            urgency_level = np.random.choice(self.urgency_levels, p=[0.3, 0.4, 0.2, 0.1])
-            
-            urgency_days = {
-                'LOW': np.random.randint(7, 30),
-                'MEDIUM': np.random.randint(3, 7),
-                'HIGH': np.random.randint(1, 3),
-                'CRITICAL': np.random.randint(1, 2)/24  # fraction of a day
-            }
-            
-            required_by_date = datetime.now() + timedelta(days=urgency_days[urgency_level])
-            
-            patient = {
-                'patient_id': f"PAT_{i+1:06d}",
-                'name': f"Patient_{i+1}",
-                'age': age,
-                'gender': gender,
-                'blood_type_required': blood_type_required,
-                'location': location,
-                'latitude': city['lat'] + np.random.normal(0, 0.01),
-                'longitude': city['lon'] + np.random.normal(0, 0.01),
-                'urgency_level': urgency_level,
-                'required_by_date': required_by_date.strftime('%Y-%m-%d %H:%M:%S'),
-                'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            }
-            patients.append(patient)
-        
-        df = pd.DataFrame(patients)
+        rng = self.rngs['patients']
+        
+        ages = np.clip(rng.normal(45, 20, count).astype(int), 1, 85)
+        gender_code = self._sample_codes(rng, self.patient_gender_cdf, count)
+        blood_idx = self._sample_blood_types(rng, count)
+        city_idx = self._sample_codes(rng, self.city_cdf, count)
+        urgency_code = self._sample_codes(rng, self.patient_urgency_cdf, count)
+        
+        # Days until the blood is needed, from the range for each sampled urgency code
+        ranges = self.patient_deadline_days[urgency_code]
+        urgency_days = rng.integers(ranges[:, 0], ranges[:, 1])
+        critical = urgency_code == self.urgency_levels.index('CRITICAL')
+        urgency_days = np.where(critical, urgency_days / 24, urgency_days)  # fraction of a day
+        now = pd.Timestamp.now()
+        required_by = now + pd.to_timedelta(urgency_days, unit='D')
+        
+        df = pd.DataFrame({
+            'patient_id': self._sequence_labels('PAT_', count, 6, id_offset + 1),
+            'name': self._sequence_labels('Patient_', count, start=id_offset + 1),
+            'age': ages.astype(np.int8),
+            'gender': pd.Categorical.from_codes(gender_code, self.genders),
+            'blood_type_required': pd.Categorical.from_codes(blood_idx, self.blood_types_arr),
+            'location': pd.Categorical.from_codes(city_idx, self.city_names),
+            'latitude': (self.city_lat[city_idx] + rng.normal(0, 0.01, count)).astype(np.float32),
+            'longitude': (self.city_lon[city_idx] + rng.normal(0, 0.01, count)).astype(np.float32),
+            'urgency_level': pd.Categorical.from_codes(urgency_code, self.urgency_levels),
+            'required_by_date': required_by.strftime('%Y-%m-%d %H:%M:%S'),
+            'created_at': now.strftime('%Y-%m-%d %H:%M:%S')
+        })
         print(f"Generated {len(df)} patient records")
         return df
 
-    def generate_emergency_requests(self, count: int = 200) -> pd.DataFrame:
+    def generate_emergency_requests(self, count: int = 200, id_offset: int = 0) -> pd.DataFrame:
         """Generate synthetic emergency request data"""
         print(f"Generating {count} emergency request records...")
-        requests = []
-
-        blood_types = list(self.blood_type_distribution.keys())
-        blood_probs = np.array(list(self.blood_type_distribution.values()))
-        blood_probs = blood_probs / blood_probs.sum()
-        city_weights = np.array([c['weight'] for c in self.cities])
-        city_weights = city_weights / city_weights.sum()
-        
-        for i in range(count):
-            blood_type_needed = np.random.choice(blood_types, p=blood_probs)
-            city = np.random.choice(self.cities, p=city_weights)
-            location = f"{city['name']}, India"
-            urgency_level = np.random.choice(self.urgency_levels, p=[0.1, 0.2, 0.4, 0.3])
-            
-            urgency_hours = {
-                'LOW': np.random.randint(24, 168),
-                'MEDIUM': np.random.randint(6, 24),
-                'HIGH': np.random.randint(1, 6),
-                'CRITICAL': np.random.randint(0, 1)
-            }
-            timestamp = datetime.now() - timedelta(hours=urgency_hours[urgency_level])
-            
-            request = {
-                'request_id': f"REQ_{i+1:06d}",
-                'blood_type_needed': blood_type_needed,
-                'location': location,
-                'latitude': city['lat'] + np.random.normal(0, 0.01),
-                'longitude': city['lon'] + np.random.normal(0, 0.01),
-                'urgency_level': urgency_level,
-                'timestamp': timestamp.strftime('%Y-%m-%d %H:%M:%S'),
-                'status': np.random.choice(['Active', 'Fulfilled', 'Expired'], p=[0.6, 0.3, 0.1]),
-                'units_required': np.random.randint(1, 5),
-                'hospital_name': f"Hospital_{random.randint(1, 20)}",
-                'contact_person': f"Dr. {random.choice(['Sharma', 'Patel', 'Singh', 'Kumar', 'Verma'])}",
-                'contact_number': f"+91-{random.randint(7000000000, 9999999999)}"
-            }
-            requests.append(request)
-        
-        return pd.DataFrame(requests)
+        rng = self.rngs['emergency_requests']
+        
+        request_ids = self._sequence_labels('REQ_', count, 6, id_offset + 1)
+        hospital_names = self.hospital_names[rng.integers(0, len(self.hospital_names), count)]
+        contact_persons = self.contact_persons[rng.integers(0, len(self.contact_persons), count)]
+        contact_numbers = self._contact_numbers(rng, count)
+        
+        # Request age in hours by urgency, converted to timestamps in one pass
+        urgency_code = self._sample_codes(rng, self.request_urgency_cdf, count)
+        ranges = self.request_age_hours[urgency_code]
+        urgency_hours = rng.integers(ranges[:, 0], ranges[:, 1])
+        timestamps = (pd.Timestamp.now() - pd.to_timedelta(urgency_hours, unit='h')).strftime('%Y-%m-%d %H:%M:%S')
+        
+        blood_idx = self._sample_blood_types(rng, count)
+        city_idx = self._sample_codes(rng, self.city_cdf, count)
+        
+        return pd.DataFrame({
+            'request_id': request_ids,
+            'blood_type_needed': pd.Categorical.from_codes(blood_idx, self.blood_types_arr),
+            'location': pd.Categorical.from_codes(city_idx, self.city_names),
+            'latitude': (self.city_lat[city_idx] + rng.normal(0, 0.01, count)).astype(np.float32),
+            'longitude': (self.city_lon[city_idx] + rng.normal(0, 0.01, count)).astype(np.float32),
+            'urgency_level': pd.Categorical.from_codes(urgency_code, self.urgency_levels),
+            'timestamp': timestamps,
+            'status': pd.Categorical.from_codes(self._sample_codes(rng, self.request_status_cdf, count), self.request_statuses),
+            'units_required': rng.integers(1, 5, count).astype(np.int8),
+            'hospital_name': hospital_names,
+            'contact_person': contact_persons,
+            'contact_number': contact_numbers
+        })
 
     def generate_historical_donations(self, donors_df: pd.DataFrame, max_records: int = 10) -> pd.DataFrame:
         """Generate historical donation records for donors"""
         print("Generating historical donation records...")
-        records = []
-        for _, donor in donors_df.iterrows():
-            num_donations = np.random.randint(1, max_records + 1)
-            for _ in range(num_donations):
-                donation_date = datetime.now() - timedelta(days=int(np.random.exponential(180)))
-                records.append({
-                    'donor_id': donor['donor_id'],
-                    'donation_date': donation_date.strftime('%Y-%m-%d'),
-                    'blood_type': donor['blood_type'],
-                    'location': donor['location']
-                })
-        return pd.DataFrame(records)
-
-    def save_datasets(self, output_dir: str = "./data"):
+        rng = self.rngs['historical_donations']
+        
+        # Repeat each donor's columns once per donation instead of iterating rows
+        n_per_donor = rng.integers(1, max_records + 1, size=len(donors_df))
+        days_ago = rng.exponential(180, size=int(n_per_donor.sum())).astype('int64')
+        donation_dates = pd.Timestamp.now().normalize() - pd.to_timedelta(days_ago, unit='D')
+        
+        return pd.DataFrame({
+            'donor_id': np.repeat(donors_df['donor_id'].to_numpy(), n_per_donor),
+            'donation_date': donation_dates.strftime('%Y-%m-%d'),
+            # Series.repeat keeps categorical columns categorical
+            'blood_type': donors_df['blood_type'].repeat(n_per_donor).array,
+            'location': donors_df['location'].repeat(n_per_donor).array
+        })
+
+    def stream_dataset(self, dataset: str, count: int, path, chunk_size: int = 50_000) -> int:
+        """
+        Generate a large dataset in chunks, appending each chunk to one CSV file
+        
+        The next chunk is synthesized while the previous one is written on a
+        background thread, so peak memory stays around two chunks for any count.
+        
+        Args:
+            dataset: One of 'donors', 'patients' or 'emergency_requests'
+            count: Total number of records to generate
+            path: Output CSV path
+            chunk_size: Records generated per chunk
+            
+        Returns:
+            Number of records written
+        """
+        if dataset not in ('donors', 'patients', 'emergency_requests'):
+            raise ValueError(f"Dataset '{dataset}' cannot be streamed")
+        generate = getattr(self, f"generate_{dataset}")
+        
+        with open(path, 'wb') as f, ThreadPoolExecutor(max_workers=1) as writer:
+            pending = None
+            for start in range(0, count, chunk_size):
+                chunk = generate(min(chunk_size, count - start), id_offset=start)
+                if pending is not None:
+                    pending.result()
+                pending = writer.submit(write_csv, chunk, f, start == 0)
+            if pending is not None:
+                pending.result()
+        
+        return count
+    
+    def save_datasets(self, output_dir: str = "./data") -> Dict[str, pd.DataFrame]:
         """Generate and save all datasets as CSVs"""
         output_path = Path(output_dir)
         output_path.mkdir(parents=True, exist_ok=True)
         print("Starting synthetic dataset generation...")
 
-        donors_df = self.generate_donors(1000)
-        donors_df.to_csv(output_path / "donors.csv", index=False)
-        
-        patients_df = self.generate_patients(500)
-        patients_df.to_csv(output_path / "patients.csv", index=False)
-        
-        requests_df = self.generate_emergency_requests(200)
-        requests_df.to_csv(output_path / "emergency_requests.csv", index=False)
-        
-        historical_df = self.generate_historical_donations(donors_df)
-        historical_df.to_csv(output_path / "historical_donations.csv", index=False)
+        # Donors, patients and requests are independent; only history waits on donors
+        with ProcessPoolExecutor(max_workers=3) as executor:
+            donors_future = executor.submit(_generate_in_worker, self.seed, 'donors', 1000)
+            patients_future = executor.submit(_generate_in_worker, self.seed, 'patients', 500)
+            requests_future = executor.submit(_generate_in_worker, self.seed, 'emergency_requests', 200)
+            
+            donors_df = donors_future.result()
+            write_csv(donors_df, output_path / "donors.csv")
+            
+            historical_df = self.generate_historical_donations(donors_df)
+            write_csv(historical_df, output_path / "historical_donations.csv")
+            
+            patients_df = patients_future.result()
+            write_csv(patients_df, output_path / "patients.csv")
+            
+            requests_df = requests_future.result()
+            write_csv(requests_df, output_path / "emergency_requests.csv")
 
         print(f"Datasets saved to {output_path.resolve()}")
+        return {
+            'donors': donors_df,
+            'patients': patients_df,
+            'emergency_requests': requests_df,
+            'historical_donations': historical_df
+        }
 
 
 if __name__ == "__main__":
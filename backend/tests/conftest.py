@@ -0,0 +1,8 @@
+"""
+Pytest configuration: make the backend sources importable as ``services``/``utils``/``ml``
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'src'))
@@ -0,0 +1,31 @@
+"""
+Donor lookup tests for the WhatsApp chatbot
+"""
+
+import pandas as pd
+
+from services.whatsappChatbotService import WhatsAppChatbotService
+
+
+def _concatenated_donors():
+    """Two donor batches concatenated without resetting the index (labels 0, 1, 0, 1)"""
+    first = pd.DataFrame({'donor_id': ['D1', 'D2'], 'contact_number': ['+91-9876543210', '9123456789']})
+    second = pd.DataFrame({'donor_id': ['D3', 'D4'], 'contact_number': ['+91 9000000000', '9876543210']})
+    return pd.concat([first, second])
+
+
+def test_exact_match_with_duplicate_index_labels():
+    service = WhatsAppChatbotService()
+    donors_df = _concatenated_donors()
+
+    assert service._find_donor_profile('9000000000', donors_df)['donor_id'] == 'D3'
+    # Duplicate numbers resolve to the first donor
+    assert service._find_donor_profile('+91 98765 43210', donors_df)['donor_id'] == 'D1'
+
+
+def test_partial_match_with_duplicate_index_labels():
+    service = WhatsAppChatbotService()
+    donors_df = _concatenated_donors()
+
+    assert service._find_donor_profile('912345', donors_df)['donor_id'] == 'D2'
+    assert service._find_donor_profile('1111', donors_df) is None
@@ -0,0 +1,64 @@
+"""
+Intent classification tests for the WhatsApp chatbot
+"""
+
+import re
+
+import pytest
+
+from services.whatsappChatbotService import INTENT_KEYWORDS, _intent_of, _keyword_pattern
+
+
+@pytest.mark.parametrize('text, intent', [
+    ('i want to make donations', 'donation_info'),
+    ('donating this weekend', 'donation_info'),
+    ('need blood urgently', 'emergency_request'),
+    ('any emergencies nearby', 'emergency_request'),
+    ('matches for my patient', 'find_donor'),
+])
+def test_inflected_keywords_match(text, intent):
+    assert _intent_of(text) == intent
+
+
+@pytest.mark.parametrize('text, intent', [
+    ('hi', 'greeting'),
+    ('hey there', 'greeting'),
+    ('am i eligible', 'eligibility'),
+    ('show my history', 'donation_history'),
+    ('find donor', 'find_donor'),
+    ('sos', 'emergency_request'),
+])
+def test_plain_keywords_match(text, intent):
+    assert _intent_of(text) == intent
+
+
+@pytest.mark.parametrize('text', ['this', 'agency', 'thanks'])
+def test_short_keywords_do_not_match_inside_words(text):
+    assert _intent_of(text) == 'unknown'
+
+
+def _reference_intent(text):
+    """Check intents one at a time in priority order, as the per-intent matcher did"""
+    for intent, words in INTENT_KEYWORDS.items():
+        if any(re.search(r'\b' + _keyword_pattern(word), text) for word in words):
+            return intent
+    return 'unknown'
+
+
+@pytest.mark.parametrize('text', [
+    'i want to make donations',
+    'need blood urgently',
+    'any emergencies nearby',
+    'hi, any emergencies? need help with donations',
+    'what are the requirements for donating',
+    'search compatible donors urgently',
+    'show my donations history',
+    'this agency',
+])
+def test_cached_intent_matches_reference(text):
+    _intent_of.cache_clear()
+    first = _intent_of(text)
+    assert first == _reference_intent(text)
+    # The second lookup is served from the cache and must agree
+    assert _intent_of(text) == first
+    assert _intent_of.cache_info().hits == 1